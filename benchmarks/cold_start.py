@@ -0,0 +1,118 @@
+"""Cold-start time of the launcher server against a time-to-first-healthy budget
+
+Starts ``python -m launcher`` from scratch several times and measures how
+long it takes until ``GET /health`` first answers 200 (healthy) and until a
+Flask route, ``GET /status``, does too (ready):
+
+    python benchmarks/cold_start.py --runs 10 --budget-ms 400
+
+Exits with status 1 when the median time to healthy is over the budget
+(LAUNCHER_COLD_START_BUDGET_MS, default 500 ms), so it can gate a release.
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for(port, path, started, deadline, process):
+    """Milliseconds since ``started`` until ``path`` answers 200"""
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", path)
+            response = conn.getresponse()
+            response.read()
+            conn.close()
+            if response.status == 200:
+                return (time.monotonic() - started) * 1000
+        except OSError:
+            pass
+        time.sleep(0.002)
+    raise RuntimeError(f"GET {path} did not answer within the deadline")
+
+
+def measure(profile, workdir, timeout):
+    port = free_port()
+    env = dict(os.environ, PYTHONPATH=ROOT, LAUNCHER_PORT=str(port), LAUNCHER_HOST="127.0.0.1")
+    started = time.monotonic()
+    process = subprocess.Popen([sys.executable, "-m", "launcher", "--profile", profile],
+                               cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = started + timeout
+        healthy = wait_for(port, "/health", started, deadline, process)
+        ready = wait_for(port, "/status", started, deadline, process)
+    finally:
+        process.terminate()
+        process.wait(10)
+    return healthy, ready
+
+
+def interpreter_floor(runs):
+    """Milliseconds for the interpreter alone to start and exit, for scale"""
+    times = []
+    for _ in range(runs):
+        started = time.monotonic()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        times.append((time.monotonic() - started) * 1000)
+    return statistics.median(times)
+
+
+def summarize(values):
+    values = sorted(values)
+    return {
+        "min_ms": round(values[0], 1),
+        "median_ms": round(statistics.median(values), 1),
+        "max_ms": round(values[-1], 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--profile", default="app", help="app or game_launcher")
+    parser.add_argument("--budget-ms", type=float,
+                        default=float(os.environ.get("LAUNCHER_COLD_START_BUDGET_MS", 500)))
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-run deadline in seconds")
+    args = parser.parse_args()
+
+    healthy, ready = [], []
+    with tempfile.TemporaryDirectory() as workdir:
+        # The first start warms the OS file cache and writes bytecode; it is not counted
+        measure(args.profile, workdir, args.timeout)
+        for _ in range(args.runs):
+            h, r = measure(args.profile, workdir, args.timeout)
+            healthy.append(h)
+            ready.append(r)
+
+    result = {
+        "profile": args.profile,
+        "runs": args.runs,
+        "interpreter_ms": round(interpreter_floor(5), 1),
+        "healthy": summarize(healthy),
+        "ready": summarize(ready),
+        "budget_ms": args.budget_ms,
+    }
+    result["within_budget"] = result["healthy"]["median_ms"] <= args.budget_ms
+    print(json.dumps(result, indent=2))
+    sys.exit(0 if result["within_budget"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,385 @@
+"""Load test of the command routes with stub games and stub Electron listeners (Linux)
+
+Starts app.py or game_launcher.py in a subprocess with its registry pointed at
+stub executables, runs stand-in Electron listeners on 5005/5006, and drives
+/keypress, /close, /stop and /health with keep-alive clients:
+
+    python benchmarks/loadtest.py --clients 8 --duration 10 \\
+        --mix keypress=4,close=1,stop=1,health=4 --output loadtest.json
+
+Reports throughput and latency per route, how long launched stubs took to
+come alive, and any stub processes left running or unreaped afterwards.
+Results are written as JSON so runs can be diffed between versions.
+"""
+import argparse
+import collections
+import http.client
+import http.server
+import json
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STUB_GAMES = [("STA", "a"), ("STB", "b"), ("STC", "c"), ("STD", "d")]
+
+# Records when it came alive, then stays up like a game until it is terminated
+STUB_SCRIPT = """#!/bin/sh
+echo "{code} $(date +%s.%N) $$" >> "{alive_log}"
+exec sleep 3600
+"""
+
+DEFAULT_MIX = "keypress=4,close=1,stop=1,health=4"
+
+
+def serve(server, port):
+    sys.path.insert(0, ROOT)
+    # Injected keys would land on the desktop running the benchmark
+    import keyboard
+    keyboard.press_and_release = lambda *args, **kwargs: None
+    launcher = __import__(server)
+    from launcher.serving import serve as serve_app
+    serve_app(launcher.app, host="127.0.0.1", port=port, debug=False,
+              on_shutdown=launcher.shutdown)
+
+
+def write_stubs(workdir):
+    alive_log = os.path.join(workdir, "alive.log")
+    games = []
+    for code, hotkey in STUB_GAMES:
+        path = os.path.join(workdir, f"stub_{code.lower()}.sh")
+        with open(path, "w") as f:
+            f.write(STUB_SCRIPT.format(code=code, alive_log=alive_log))
+        os.chmod(path, 0o755)
+        games.append({"code": code, "name": f"Stub {code}", "hotkey": hotkey, "path": path})
+    games_file = os.path.join(workdir, "games.json")
+    with open(games_file, "w") as f:
+        json.dump({"games": games}, f, indent=2)
+    return games_file, alive_log
+
+
+class StubListener(http.server.ThreadingHTTPServer):
+    """Stands in for the Electron main process' command listeners"""
+
+    daemon_threads = True
+
+    def __init__(self, port):
+        self.received = collections.Counter()
+        self.lock = threading.Lock()
+        super().__init__(("127.0.0.1", port), _StubHandler)
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+
+class _StubHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        with self.server.lock:
+            self.server.received[f"{self.path} {body.decode(errors='replace')}".strip()] += 1
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ("keypress", "close", "stop", "health"):
+            raise SystemExit(f"Unknown route in mix: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def request_for(route, rng):
+    """(method, path, body, launched game code) for one request of ``route``"""
+    if route == "keypress":
+        code, hotkey = rng.choice(STUB_GAMES)
+        return "POST", "/keypress", json.dumps({"key": hotkey}), code
+    if route == "close":
+        return "POST", "/close", "{}", None
+    if route == "stop":
+        return "POST", "/stop", None, None
+    return "GET", "/health", None, None
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_ready(port, timeout=15):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/health")
+            conn.getresponse().read()
+            conn.close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Server on port {port} did not come up")
+
+
+def drive(port, clients, duration, mix, seed):
+    routes = list(mix)
+    weights = [mix[route] for route in routes]
+    samples = collections.defaultdict(list)
+    outcomes = collections.defaultdict(collections.Counter)
+    launches = []
+    lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+
+    def client(index):
+        rng = random.Random(seed + index)
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        local = collections.defaultdict(list)
+        local_outcomes = collections.defaultdict(collections.Counter)
+        local_launches = []
+        while time.monotonic() < stop_at:
+            route = rng.choices(routes, weights)[0]
+            method, path, body, code = request_for(route, rng)
+            sent_at = time.time()
+            started = time.perf_counter()
+            try:
+                conn.request(method, path, body=body, headers={"Content-Type": "application/json"})
+                response = conn.getresponse()
+                payload = response.read()
+                if response.will_close:
+                    conn.close()
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                local_outcomes[route]["connection_error"] += 1
+                continue
+            local[route].append(time.perf_counter() - started)
+            try:
+                result = json.loads(payload)
+            except ValueError:
+                result = {}
+            if response.status != 200:
+                outcome = f"http_{response.status}"
+            elif result.get("busy"):
+                outcome = "busy"
+            elif result.get("deduplicated"):
+                outcome = "deduplicated"
+            else:
+                outcome = result.get("status", "ok")
+            local_outcomes[route][outcome] += 1
+            if code is not None and outcome == "success":
+                local_launches.append((code, sent_at))
+        conn.close()
+        with lock:
+            for route, values in local.items():
+                samples[route].extend(values)
+            for route, counts in local_outcomes.items():
+                outcomes[route].update(counts)
+            launches.extend(local_launches)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    routes_report = {}
+    for route in routes:
+        routes_report[route] = dict(summarize(samples[route]),
+                                    rps=round(len(samples[route]) / elapsed, 1),
+                                    outcomes=dict(outcomes[route]))
+    total = sum(len(values) for values in samples.values())
+    return {"elapsed_s": round(elapsed, 2), "requests": total, "rps": round(total / elapsed, 1),
+            "routes": routes_report}, launches
+
+
+def summarize(latencies):
+    latencies = sorted(latencies)
+
+    def pct(p):
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000, 2) if latencies else None
+
+    return {"requests": len(latencies), "p50_ms": pct(0.50), "p95_ms": pct(0.95), "p99_ms": pct(0.99)}
+
+
+def launch_to_alive(alive_log, launches):
+    """Milliseconds from each successful launch request to its stub recording that it started"""
+    try:
+        with open(alive_log) as f:
+            alive = [line.split() for line in f if line.strip()]
+    except FileNotFoundError:
+        alive = []
+    by_code = collections.defaultdict(list)
+    for code, sent_at in launches:
+        by_code[code].append(sent_at)
+    delays = []
+    for code, alive_at, _ in alive:
+        # Pair each start with the latest successful request for that game sent before it
+        sent = [t for t in by_code.get(code, ()) if t <= float(alive_at)]
+        if sent:
+            delays.append(float(alive_at) - max(sent))
+    report = summarize(delays)
+    report["stubs_started"] = len(alive)
+    return report
+
+
+def _state(pid):
+    """Process state letter from /proc, or None if there is no such process"""
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            stat = f.read()
+    except OSError:
+        return None
+    return stat[stat.rindex(b")") + 2:][:1].decode()
+
+
+def stub_pids(workdir):
+    """Every pid a stub ran under; a stub exec's into sleep, so its pid stays the same"""
+    pids = set()
+    try:
+        with open(os.path.join(workdir, "alive.log")) as f:
+            pids.update(int(line.split()[2]) for line in f if line.strip())
+    except FileNotFoundError:
+        pass
+    # Stubs that have not written their line yet still have the script on the command line
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/cmdline", "rb") as f:
+                    if workdir.encode() in f.read():
+                        pids.add(int(entry))
+            except OSError:
+                continue
+    return pids
+
+
+def leftovers(workdir):
+    running, zombies = [], []
+    for pid in sorted(stub_pids(workdir)):
+        state = _state(pid)
+        if state == "Z":
+            zombies.append(pid)
+        elif state is not None:
+            running.append(pid)
+    return {"running": running, "zombies": zombies}
+
+
+def stop_all(port):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    conn.request("POST", "/close")
+    conn.getresponse().read()
+    conn.close()
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--server", choices=("app", "game_launcher"), default="app")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--mix", default=DEFAULT_MIX,
+                        help=f"route=weight pairs (default {DEFAULT_MIX})")
+    parser.add_argument("--max-games", type=int, default=1, help="LAUNCHER_MAX_GAMES for the server")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--admission", action="store_true",
+                        help="keep the per-client rate limits on; by default they are off so handlers are measured")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--serve", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port)
+        return
+
+    if not sys.platform.startswith("linux"):
+        raise SystemExit("The load test uses shell stub games and /proc; run it on Linux")
+
+    mix = parse_mix(args.mix)
+    try:
+        listeners = {port: StubListener(port) for port in (5005, 5006)}
+    except OSError as e:
+        raise SystemExit(f"Cannot open the stub Electron listeners on 5005/5006: {e}")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        games_file, alive_log = write_stubs(workdir)
+        port = free_port()
+        env = dict(os.environ,
+                   LAUNCHER_GAMES_FILE=games_file,
+                   LAUNCHER_MAX_GAMES=str(args.max_games),
+                   LAUNCHER_ADMISSION="1" if args.admission else "0",
+                   LAUNCHER_LOG_LEVEL=os.environ.get("LAUNCHER_LOG_LEVEL", "WARNING"))
+        server = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--serve", args.server, "--port", str(port)],
+            cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_ready(port)
+            load, launches = drive(port, args.clients, args.duration, mix, args.seed)
+            # Let the last launches record themselves, then clean up through the API
+            time.sleep(0.2)
+            stop_all(port)
+            after_close = leftovers(workdir)
+        finally:
+            server.send_signal(signal.SIGTERM)
+            try:
+                server.wait(15)
+            except subprocess.TimeoutExpired:
+                server.kill()
+                server.wait()
+        after_exit = leftovers(workdir)
+        for pid in after_exit["running"]:
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except OSError:
+                pass
+
+        # Delivery to the listeners is asynchronous; give the notifier a moment
+        time.sleep(0.5)
+        results = {
+            "revision": git_revision(),
+            "server": args.server,
+            "clients": args.clients,
+            "duration_s": args.duration,
+            "mix": mix,
+            "max_games": args.max_games,
+            **load,
+            "launch_to_alive_ms": launch_to_alive(alive_log, launches),
+            "leftovers_after_close": after_close,
+            "orphans_after_exit": after_exit,
+            "electron_notifications": {str(port): dict(listener.received)
+                                       for port, listener in listeners.items()},
+        }
+
+    for listener in listeners.values():
+        listener.shutdown()
+        listener.server_close()
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
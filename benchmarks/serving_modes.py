@@ -0,0 +1,174 @@
+"""Throughput and server CPU of the debug, production and fast-path serving modes
+
+Starts app.py in a subprocess under each server and drives it with keep-alive
+clients for a fixed time; "production" is the pooled server with the /health
+and preflight fast path turned off, "fastpath" the same server with it on:
+
+    python benchmarks/serving_modes.py --clients 8 --duration 10
+    python benchmarks/serving_modes.py --modes production,fastpath --routes health,preflight
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ROUTES = {
+    "health": ("GET", "/health", None),
+    "status": ("GET", "/status", None),
+    "preflight": ("OPTIONS", "/keypress", None),
+}
+
+
+def serve(mode, port):
+    sys.path.insert(0, ROOT)
+    import app as launcher
+    if mode == "debug":
+        # What app.run(debug=True, threaded=True) serves, minus the reloader process
+        from werkzeug.debug import DebuggedApplication
+        from werkzeug.serving import make_server
+        server = make_server("127.0.0.1", port, DebuggedApplication(launcher.app, evalex=True), threaded=True)
+        server.serve_forever()
+    else:
+        from launcher.serving import PooledWSGIServer
+        server = PooledWSGIServer("127.0.0.1", port, launcher.app)
+        server.serve_forever()
+
+
+def cpu_seconds(pid):
+    """User plus system CPU time the process has used so far"""
+    try:
+        import psutil
+    except ImportError:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            fields = f.read().rsplit(b")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    times = psutil.Process(pid).cpu_times()
+    return times.user + times.system
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_ready(port, timeout=15):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/health")
+            conn.getresponse().read()
+            conn.close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Server on port {port} did not come up")
+
+
+def drive(port, clients, duration, routes):
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+
+    def client(index):
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+        local = []
+        i = index
+        while time.monotonic() < stop_at:
+            method, path, body = routes[i % len(routes)]
+            i += 1
+            started = time.perf_counter()
+            try:
+                conn.request(method, path, body=body, headers={
+                    "Origin": "http://localhost:8080",
+                    "Access-Control-Request-Method": "POST",
+                })
+                response = conn.getresponse()
+                response.read()
+                if response.will_close:
+                    conn.close()
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                with lock:
+                    errors[0] += 1
+                continue
+            local.append(time.perf_counter() - started)
+        conn.close()
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    latencies.sort()
+
+    def pct(p):
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000, 2) if latencies else None
+
+    return {
+        "requests": len(latencies),
+        "errors": errors[0],
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--modes", default="debug,production,fastpath")
+    parser.add_argument("--routes", default="health,status,preflight",
+                        help=f"comma-separated, from {', '.join(ROUTES)}")
+    parser.add_argument("--serve", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port)
+        return
+
+    routes = [ROUTES[name] for name in args.routes.split(",")]
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for mode in args.modes.split(","):
+            port = free_port()
+            env = dict(os.environ, LAUNCHER_LOG_LEVEL=os.environ.get("LAUNCHER_LOG_LEVEL", "INFO"),
+                       LAUNCHER_FASTPATH="1" if mode == "fastpath" else "0")
+            server = subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), "--serve", mode, "--port", str(port)],
+                cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            try:
+                wait_ready(port)
+                cpu_before = cpu_seconds(server.pid)
+                results[mode] = drive(port, args.clients, args.duration, routes)
+                cpu = cpu_seconds(server.pid) - cpu_before
+                results[mode]["server_cpu_s"] = round(cpu, 2)
+                if results[mode]["requests"]:
+                    results[mode]["cpu_us_per_request"] = round(cpu / results[mode]["requests"] * 1e6, 1)
+            finally:
+                server.terminate()
+                server.wait()
+            print(f"{mode:>10}: {json.dumps(results[mode])}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -226,6 +226,36 @@ function initWebhookEndpoint() {
               timestamp: new Date().toISOString()
             }));
           }
+          else if (payload.event === 'batch') {
+            console.log('Forwarding command batch:', payload.steps);
+            
+            // Answer with the result of every step once the whole batch has run
+            fetch('http://localhost:5002/batch', {
+              method: 'POST',
+              headers: { 
+                'Content-Type': 'application/json; charset=utf-8',
+                'Accept-Charset': 'UTF-8'
+              },
+              body: JSON.stringify({
+                steps: payload.steps,
+                stop_on_error: payload.stop_on_error,
+                delay_ms: payload.delay_ms
+              }),
+              signal: AbortSignal.timeout(30000)
+            })
+            .then(async response => {
+              res.writeHead(response.status, { 'Content-Type': 'application/json' });
+              res.end(await response.text());
+            })
+            .catch(error => {
+              console.error('Error sending command batch:', error);
+              res.writeHead(502, { 'Content-Type': 'application/json' });
+              res.end(JSON.stringify({ 
+                status: 'error', 
+                message: 'Launcher server did not run the batch'
+              }));
+            });
+          }
           else {
             res.writeHead(400, { 'Content-Type': 'application/json' });
             res.end(JSON.stringify({ 
@@ -347,6 +377,43 @@ ipcMain.on('simulate-keypress', async (event, key) => {
   }
 });
 
+// Several commands in one request, e.g. a changeover: stop, launch, then menu keys
+ipcMain.on('run-command-batch', async (event, batch) => {
+  console.log('Received command batch in main process:', batch);
+
+  try {
+    const response = await fetch('http://localhost:5002/batch', {
+      method: 'POST',
+      headers: { 
+        'Content-Type': 'application/json; charset=utf-8',
+        'Accept-Charset': 'UTF-8'
+      },
+      body: JSON.stringify(batch),
+      signal: AbortSignal.timeout(30000)
+    });
+
+    const text = await response.text();
+    console.log('Python server batch response:', text);
+
+    if (mainWindow) {
+      mainWindow.webContents.send('cpp-server-response', {
+        key: 'batch',
+        status: response.status,
+        response: text
+      });
+    }
+  } catch (error) {
+    console.error('Error sending command batch to Python server:', error);
+
+    if (mainWindow) {
+      mainWindow.webContents.send('cpp-server-error', {
+        key: 'batch',
+        error: error.message
+      });
+    }
+  }
+});
+
 ipcMain.on('launch-steam-game', (event, steamUrl) => {
   console.log(`Launching game with Steam URL: ${steamUrl}`);
   
@@ -7,6 +7,7 @@ contextBridge.exposeInMainWorld('electron', {
       // Whitelist of allowed channels
       const validChannels = [
         'simulate-keypress', 
+        'run-command-batch',
         'exit-kiosk',
         'launch-steam-game',
         'end-game'
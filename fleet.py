@@ -0,0 +1,361 @@
+"""Fleet controller: sends one command to every station's launcher server at once
+
+Stations are listed in a JSON file (LAUNCHER_STATIONS_FILE, default
+stations.json next to this file):
+
+    {"stations": [{"name": "pod-1", "url": "http://10.0.0.11:5002"}, ...]}
+
+One-shot commands print the aggregated result as JSON:
+
+    python fleet.py stop
+    python fleet.py launch BTS --stations pod-1,pod-2
+    python fleet.py status
+
+``python fleet.py serve`` runs the controller as a service on port 5100 that
+keeps every station's /events stream open for health and exposes /fleet.
+"""
+import argparse
+import concurrent.futures
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger("GameLauncher.fleet")
+
+# Stations send a heartbeat every 5 seconds; missing two means the station is gone
+HEARTBEAT_TIMEOUT = 12.0
+
+STATIONS_FILE = os.environ.get(
+    "LAUNCHER_STATIONS_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "stations.json"))
+
+
+class Station:
+    """One pod's launcher server, reached over a keep-alive connection pool
+
+    ``watch()`` keeps the station's /events stream open on a background
+    thread, so health and running games are pushed by the station instead of
+    polled. The stream reconnects with backoff and resumes from the last
+    event id it saw.
+    """
+
+    def __init__(self, name, url, pool_size=4):
+        self.name = name
+        self.url = url.rstrip("/")
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._hotkeys = {}
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._watcher = None
+        self.connected = False
+        self.last_seen = None
+        self.last_error = None
+        self.running = {}
+
+    @property
+    def healthy(self):
+        return self.last_seen is not None and time.monotonic() - self.last_seen < HEARTBEAT_TIMEOUT
+
+    def request(self, method, path, timeout, **kwargs):
+        return self.session.request(method, self.url + path, timeout=timeout, **kwargs)
+
+    def hotkey(self, game_code, timeout):
+        """The key that launches ``game_code`` on this station, from its /games registry"""
+        if game_code not in self._hotkeys:
+            response = self.request("GET", "/games", timeout)
+            response.raise_for_status()
+            self._hotkeys = {game["code"]: game["hotkey"] for game in response.json()["games"]
+                             if game.get("hotkey")}
+        return self._hotkeys.get(game_code)
+
+    def watch(self):
+        if self._watcher is None:
+            self._watcher = threading.Thread(target=self._watch, name=f"fleet-{self.name}", daemon=True)
+            self._watcher.start()
+
+    def close(self):
+        # Closing the stream here would wait for the watcher's read to return, up to a heartbeat;
+        # the watcher closes it itself after the next line it reads
+        self._closed.set()
+        self.session.close()
+
+    def _watch(self):
+        backoff = 1.0
+        last_event_id = None
+        while not self._closed.is_set():
+            headers = {"Accept": "text/event-stream"}
+            if last_event_id:
+                headers["Last-Event-ID"] = last_event_id
+            try:
+                # The read timeout doubles as the heartbeat watchdog
+                with requests.get(self.url + "/events", headers=headers, stream=True,
+                                  timeout=(3, HEARTBEAT_TIMEOUT)) as response:
+                    response.raise_for_status()
+                    self._seed()
+                    backoff = 1.0
+                    last_event_id = self._read_events(response, last_event_id)
+            except (requests.RequestException, ValueError, AttributeError) as e:
+                # Only log changes, not every failed reconnect to a station that is down
+                if not self._closed.is_set() and str(e) != self.last_error:
+                    self.last_error = str(e)
+                    logger.warning("Lost event stream from %s: %s", self.name, e)
+            finally:
+                self.connected = False
+            self._closed.wait(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+    def _seed(self):
+        response = self.request("GET", "/status", HEARTBEAT_TIMEOUT)
+        response.raise_for_status()
+        with self._lock:
+            self.running = {game["game_code"]: game for game in response.json()["running"]}
+        self.connected = True
+        self.last_seen = time.monotonic()
+        self.last_error = None
+
+    def _read_events(self, response, last_event_id):
+        event, data, event_id = None, [], None
+        for line in response.iter_lines(decode_unicode=True):
+            if self._closed.is_set():
+                break
+            if line:
+                field, _, value = line.partition(":")
+                value = value[1:] if value.startswith(" ") else value
+                if field == "event":
+                    event = value
+                elif field == "data":
+                    data.append(value)
+                elif field == "id":
+                    event_id = value
+                continue
+            if event is not None:
+                self._apply(event, json.loads("\n".join(data)) if data else {})
+            if event_id is not None:
+                last_event_id = event_id
+            event, data, event_id = None, [], None
+        return last_event_id
+
+    def _apply(self, event, data):
+        self.last_seen = time.monotonic()
+        if event in ("launched", "adopted"):
+            with self._lock:
+                self.running[data["game_code"]] = data
+        elif event in ("exited", "terminated"):
+            with self._lock:
+                self.running.pop(data.get("game_code"), None)
+
+    def health(self):
+        with self._lock:
+            running = sorted(self.running)
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "connected": self.connected,
+            "last_seen_s": round(time.monotonic() - self.last_seen, 1) if self.last_seen else None,
+            "running": running,
+            "last_error": self.last_error,
+        }
+
+
+class FleetController:
+    """Fans a command out to many stations concurrently against one deadline
+
+    Every station is contacted from its own pool thread over its pooled
+    connection. Whatever has not answered within ``timeout`` seconds is
+    reported as timed out rather than holding up the rest of the fleet.
+    """
+
+    def __init__(self, stations, timeout=5.0, max_workers=64):
+        self.stations = {station.name: station for station in stations}
+        self.timeout = timeout
+        self._pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(1, min(max_workers, len(self.stations))), thread_name_prefix="fleet-call")
+
+    def watch(self):
+        for station in self.stations.values():
+            station.watch()
+
+    def close(self):
+        for station in self.stations.values():
+            station.close()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def select(self, names=None):
+        if not names:
+            return list(self.stations.values())
+        unknown = [name for name in names if name not in self.stations]
+        if unknown:
+            raise KeyError(f"Unknown station(s): {', '.join(unknown)}")
+        return [self.stations[name] for name in names]
+
+    def fan_out(self, call, names=None, timeout=None):
+        """Run ``call(station, timeout)`` on every selected station and aggregate the outcomes"""
+        timeout = timeout or self.timeout
+        stations = self.select(names)
+        started = time.monotonic()
+        futures = {self._pool.submit(self._call, call, station, timeout): station for station in stations}
+        done, _ = concurrent.futures.wait(futures, timeout=timeout)
+        results = {}
+        for future, station in futures.items():
+            if future in done:
+                results[station.name] = future.result()
+            else:
+                future.cancel()
+                results[station.name] = {"ok": False, "error": f"No answer within {timeout}s"}
+        failed = sorted(name for name, result in results.items() if not result["ok"])
+        if failed:
+            logger.warning("Fleet command failed on %s of %s station(s): %s",
+                           len(failed), len(results), ", ".join(failed))
+        return {
+            "elapsed_ms": round((time.monotonic() - started) * 1000, 1),
+            "ok": sorted(name for name, result in results.items() if result["ok"]),
+            "failed": failed,
+            "stations": results,
+        }
+
+    def _call(self, call, station, timeout):
+        started = time.monotonic()
+        try:
+            response = call(station, timeout)
+            try:
+                body = response.json()
+            except ValueError:
+                body = response.text
+            ok = response.ok and not (isinstance(body, dict) and body.get("status") == "error")
+            result = {"ok": ok, "status_code": response.status_code, "result": body}
+        except (requests.RequestException, LookupError) as e:
+            result = {"ok": False, "error": str(e)}
+        result["elapsed_ms"] = round((time.monotonic() - started) * 1000, 1)
+        return result
+
+    def stop(self, names=None, timeout=None):
+        """terminate_games on every station"""
+        return self.fan_out(lambda station, t: station.request("POST", "/stop", t), names, timeout)
+
+    def launch(self, game_code, names=None, timeout=None):
+        """launch_game on every station, through the hotkey each station maps to ``game_code``"""
+        def call(station, t):
+            key = station.hotkey(game_code, t)
+            if key is None:
+                raise LookupError(f"Unknown game code: {game_code}")
+            return station.request("POST", "/keypress", t, json={"key": key})
+        return self.fan_out(call, names, timeout)
+
+    def keypress(self, key, names=None, timeout=None):
+        return self.fan_out(lambda station, t: station.request("POST", "/keypress", t, json={"key": key}),
+                            names, timeout)
+
+    def status(self, names=None, timeout=None):
+        return self.fan_out(lambda station, t: station.request("GET", "/status", t), names, timeout)
+
+    def health(self):
+        """Station health as pushed over the /events streams, without contacting any station"""
+        return {name: station.health() for name, station in self.stations.items()}
+
+
+def load_stations(path=STATIONS_FILE):
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    return [Station(entry["name"], entry["url"]) for entry in config["stations"]]
+
+
+def create_app(controller):
+    from flask import Flask, request, jsonify
+    from flask_cors import CORS
+
+    app = Flask(__name__)
+    CORS(app, resources={r"/*": {"origins": "*", "methods": ["GET", "POST", "OPTIONS"]}})
+
+    def respond(result, code=200):
+        response = jsonify(result)
+        response.headers['Content-Type'] = 'application/json; charset=utf-8'
+        return response, code
+
+    def run(command, *args):
+        data = request.get_json(silent=True) or {}
+        try:
+            return respond(command(*args, names=data.get("stations"), timeout=data.get("timeout")))
+        except KeyError as e:
+            return respond({"error": e.args[0]}, 400)
+
+    @app.route('/fleet', methods=['GET'])
+    def fleet_health():
+        """Health and running games of every station"""
+        return respond(controller.health())
+
+    @app.route('/fleet/status', methods=['GET'])
+    def fleet_status():
+        return run(controller.status)
+
+    @app.route('/fleet/stop', methods=['POST'])
+    def fleet_stop():
+        return run(controller.stop)
+
+    @app.route('/fleet/launch', methods=['POST'])
+    def fleet_launch():
+        data = request.get_json(silent=True) or {}
+        if not data.get("game_code"):
+            return respond({"error": "game_code not provided"}, 400)
+        return run(controller.launch, data["game_code"])
+
+    @app.route('/fleet/keypress', methods=['POST'])
+    def fleet_keypress():
+        data = request.get_json(silent=True) or {}
+        if not data.get("key"):
+            return respond({"error": "Key not provided"}, 400)
+        return run(controller.keypress, data["key"])
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Send launcher commands to every station at once")
+    parser.add_argument("--stations-file", default=STATIONS_FILE)
+    parser.add_argument("--stations", help="comma-separated subset of station names")
+    parser.add_argument("--timeout", type=float, default=5.0, help="per-station deadline in seconds")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("stop")
+    commands.add_parser("status")
+    commands.add_parser("launch").add_argument("game_code")
+    commands.add_parser("keypress").add_argument("key")
+    serve_parser = commands.add_parser("serve")
+    serve_parser.add_argument("--host", default="localhost")
+    serve_parser.add_argument("--port", type=int, default=5100)
+    args = parser.parse_args()
+
+    controller = FleetController(load_stations(args.stations_file), timeout=args.timeout)
+    names = args.stations.split(",") if args.stations else None
+
+    if args.command == "serve":
+        from launcher.logging_setup import setup_logging
+        from launcher.serving import serve
+        setup_logging("fleet.log")
+        controller.watch()
+        logger.info("Fleet controller for %s station(s) on http://%s:%s",
+                    len(controller.stations), args.host, args.port)
+        serve(create_app(controller), host=args.host, port=args.port, on_shutdown=controller.close)
+        return
+
+    if args.command == "launch":
+        result = controller.launch(args.game_code, names)
+    elif args.command == "keypress":
+        result = controller.keypress(args.key, names)
+    elif args.command == "status":
+        result = controller.status(names)
+    else:
+        result = controller.stop(names)
+    controller.close()
+    print(json.dumps(result, indent=2))
+    sys.exit(1 if result["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
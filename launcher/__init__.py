@@ -0,0 +1,6 @@
+"""Game launcher server for one station
+
+``python -m launcher`` runs it (see ``launcher.server``). Importing the
+package itself loads nothing; Flask, requests and keyboard are only imported
+once something needs them.
+"""
@@ -0,0 +1,230 @@
+import contextvars
+import logging
+import math
+import queue
+import threading
+import time
+
+from . import metrics
+
+logger = logging.getLogger("GameLauncher.admission")
+
+rejections_total = metrics.counter(
+    "launcher_admission_rejections_total", "Commands turned away, by command class and reason",
+    ("command", "reason"))
+queue_wait_seconds = metrics.histogram(
+    "launcher_command_queue_wait_seconds", "Time commands waited for the input worker")
+
+# Requests per second and burst size of each command class, per client
+DEFAULT_LIMITS = {
+    "key": (20.0, 40),
+    "launch": (1.0, 3),
+    "stop": (2.0, 5),
+    "batch": (1.0, 2),
+}
+
+
+def parse_limit(value, default):
+    """A "rate/burst" setting such as "20/40" as (rate, burst); a rate of 0 means unlimited"""
+    if not value:
+        return default
+    rate, _, burst = value.partition("/")
+    rate = float(rate)
+    return rate, int(burst) if burst else max(1, math.ceil(rate))
+
+
+class Rejected(Exception):
+    """A command that was not run; ``retry_after`` is in seconds"""
+
+    def __init__(self, reason, retry_after, message):
+        super().__init__(message)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _Command:
+    __slots__ = ("function", "args", "detached", "context", "enqueued", "done", "result", "error", "cancelled")
+
+    def __init__(self, function, args, detached=False):
+        self.function = function
+        self.args = args
+        self.detached = detached
+        # Runs in the submitter's context, so its spans join the request's trace
+        self.context = contextvars.copy_context()
+        self.enqueued = time.monotonic()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.cancelled = False
+
+
+class AdmissionControl:
+    """Rate limits command routes and runs the admitted commands one at a time
+
+    ``admit`` takes a token from the bucket of a client and command class,
+    refilled at ``rate`` per second up to ``burst``, and raises Rejected
+    with the time until the next token when it is empty. ``run`` puts a
+    command on a bounded queue and waits for the input worker thread, which
+    runs commands in arrival order, so injected keys, launches and
+    terminations never race each other for window focus. A full queue
+    raises Rejected at once instead of parking another server thread.
+
+    With ``enabled`` False nothing is limited, ``run`` calls the command on
+    the caller's thread and ``submit`` on a thread of its own.
+    """
+
+    def __init__(self, limits=None, queue_size=32, timeout=30.0, max_clients=1024, enabled=True):
+        self.limits = dict(DEFAULT_LIMITS, **(limits or {}))
+        self.timeout = timeout
+        self.max_clients = max_clients
+        self.enabled = enabled
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._thread = None
+        # Moving average of how long a command takes, for Retry-After on a full queue
+        self._service_time = 0.05
+        self.admitted = 0
+        self.completed = 0
+        self.rejected = {}
+
+    def admit(self, client, command_class):
+        """Take a token for ``client``; raises Rejected if its bucket for ``command_class`` is empty"""
+        if not self.enabled:
+            return
+        rate, burst = self.limits.get(command_class, (0, 0))
+        if rate <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            key = (client, command_class)
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self.max_clients:
+                    self._drop_idle_buckets(now)
+                bucket = self._buckets[key] = [float(burst), now]
+            tokens = min(burst, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            if tokens < 1:
+                bucket[0] = tokens
+                wait = (1 - tokens) / rate
+            else:
+                bucket[0] = tokens - 1
+                return
+        self._reject(command_class, "rate")
+        raise Rejected("rate", wait, f"Too many {command_class} commands, retry in {wait:.2f}s")
+
+    def run(self, function, *args, command_class="command"):
+        """Run ``function(*args)`` on the input worker and return its result, or raise what it raised"""
+        if not self.enabled:
+            return function(*args)
+        command = _Command(function, args)
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(command)
+        except queue.Full:
+            self._reject(command_class, "queue")
+            raise Rejected("queue", self._queue.qsize() * self._service_time,
+                           "Command queue is full") from None
+        with self._lock:
+            self.admitted += 1
+        if not command.done.wait(self.timeout):
+            # Skipped by the worker if it has not started yet
+            command.cancelled = True
+            self._reject(command_class, "timeout")
+            raise Rejected("timeout", self._queue.qsize() * self._service_time,
+                           f"Command did not run within {self.timeout}s")
+        if command.error is not None:
+            raise command.error
+        return command.result
+
+    def submit(self, function, *args):
+        """Queue ``function(*args)`` for the input worker without waiting for it
+
+        For commands the server raises itself, such as stopping a game whose
+        session expired: they are not rate limited and never turned away. If
+        the queue is full, a helper thread waits for room so the caller
+        still returns at once.
+        """
+        if not self.enabled:
+            context = contextvars.copy_context()
+            threading.Thread(target=context.run, args=(function, *args), name="input-command", daemon=True).start()
+            return
+        command = _Command(function, args, detached=True)
+        self._ensure_thread()
+        with self._lock:
+            self.admitted += 1
+        try:
+            self._queue.put_nowait(command)
+        except queue.Full:
+            threading.Thread(target=self._queue.put, args=(command,), name="input-submit", daemon=True).start()
+
+    def call(self, client, command_class, function, *args):
+        """``admit`` then ``run``"""
+        self.admit(client, command_class)
+        return self.run(function, *args, command_class=command_class)
+
+    def depth(self):
+        return self._queue.qsize()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "queue_depth": self._queue.qsize(),
+                "queue_size": self._queue.maxsize,
+                "admitted": self.admitted,
+                "completed": self.completed,
+                "rejected": dict(self.rejected),
+                "clients": len({client for client, _ in self._buckets}),
+                "service_time_ms": round(self._service_time * 1000, 1),
+            }
+
+    def close(self):
+        """Stop the worker once the commands already queued have run"""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(5)
+            self._thread = None
+
+    def _reject(self, command_class, reason):
+        rejections_total.labels(command_class, reason).inc()
+        with self._lock:
+            key = f"{command_class}:{reason}"
+            self.rejected[key] = self.rejected.get(key, 0) + 1
+        logger.warning("Rejected %s command (%s)", command_class, reason)
+
+    def _drop_idle_buckets(self, now):
+        # Called with the lock held; a bucket that has refilled completely holds no state worth keeping
+        for key, (tokens, last) in list(self._buckets.items()):
+            rate, burst = self.limits.get(key[1], (0, 0))
+            if rate <= 0 or tokens + (now - last) * rate >= burst:
+                del self._buckets[key]
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="input-worker", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            command = self._queue.get()
+            if command is None:
+                return
+            if command.cancelled:
+                continue
+            started = time.monotonic()
+            queue_wait_seconds.observe(started - command.enqueued)
+            try:
+                command.result = command.context.run(command.function, *command.args)
+            except Exception as e:
+                command.error = e
+                if command.detached:
+                    logger.exception("Error running queued command %s", getattr(command.function, "__name__", command.function))
+            elapsed = time.monotonic() - started
+            with self._lock:
+                self._service_time += (elapsed - self._service_time) * 0.2
+                self.completed += 1
+            command.done.set()
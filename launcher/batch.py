@@ -0,0 +1,96 @@
+import logging
+import time
+
+from . import tracing
+
+logger = logging.getLogger("GameLauncher.batch")
+
+# Bounds on one request, so a batch cannot tie up a server thread for long
+MAX_STEPS = 50
+MAX_DELAY_MS = 5000
+MAX_TOTAL_DELAY_MS = 10000
+
+
+def parse(data):
+    """The steps, stop_on_error flag and default delay of a /batch body; raises ValueError if malformed
+
+    A step is a /keypress or /close body with a ``type`` of "keypress",
+    "close" or "stop"; a step without a type that has a ``key`` is a
+    keypress. ``delay_ms`` on a step is waited before it runs, and the
+    batch-level ``delay_ms`` is the default wait between steps. All waits
+    together are capped at MAX_TOTAL_DELAY_MS.
+    """
+    if not isinstance(data, dict) or not isinstance(data.get("steps"), list):
+        raise ValueError("Expected {\"steps\": [...]}")
+    steps = data["steps"]
+    if not steps:
+        raise ValueError("No steps provided")
+    if len(steps) > MAX_STEPS:
+        raise ValueError(f"At most {MAX_STEPS} steps per batch")
+    delay_ms = _delay(data.get("delay_ms", 0))
+    parsed = []
+    for index, step in enumerate(steps):
+        if not isinstance(step, dict):
+            raise ValueError(f"Step {index} is not an object")
+        step_type = step.get("type") or ("keypress" if "key" in step else None)
+        if step_type is None:
+            raise ValueError(f"Step {index} has no type")
+        parsed.append((step_type, step, _delay(step.get("delay_ms", delay_ms if index else 0))))
+    if sum(delay for _, _, delay in parsed) > MAX_TOTAL_DELAY_MS:
+        raise ValueError(f"The delays of a batch add up to at most {MAX_TOTAL_DELAY_MS} ms")
+    return parsed, bool(data.get("stop_on_error", False))
+
+
+def _delay(value):
+    if not isinstance(value, (int, float)) or isinstance(value, bool) or not 0 <= value <= MAX_DELAY_MS:
+        raise ValueError(f"delay_ms must be a number from 0 to {MAX_DELAY_MS}")
+    return value
+
+
+@tracing.traced()
+def run_batch(steps, handlers, stop_on_error=False):
+    """Run parsed ``steps`` in order through ``handlers`` and collect one result per step
+
+    ``handlers`` maps a step type to ``handler(step) -> (result, status_code)``,
+    the same work the matching route does. A step fails on an unknown or non-string type,
+    an exception, a status code of 400 or more or a result with status
+    "error"; with ``stop_on_error`` the steps after it are skipped.
+    """
+    started = time.monotonic()
+    results = []
+    failed = False
+    for index, (step_type, step, delay_ms) in enumerate(steps):
+        if failed and stop_on_error:
+            results.append({"index": index, "type": step_type, "ok": False, "skipped": True})
+            continue
+        if delay_ms:
+            time.sleep(delay_ms / 1000)
+        step_started = time.monotonic()
+        # A type that is not a string, such as a list, cannot even be looked up
+        handler = handlers.get(step_type) if isinstance(step_type, str) else None
+        if not isinstance(step_type, str):
+            result, code = {"error": "Step type must be a string"}, 400
+        elif handler is None:
+            result, code = {"error": f"Unknown step type: {step_type}"}, 400
+        else:
+            try:
+                with tracing.span(f"batch {step_type}", index=index):
+                    result, code = handler(step)
+            except Exception as e:
+                logger.error("Batch step %s (%s) failed: %s", index, step_type, e)
+                result, code = {"error": str(e)}, 500
+        ok = code < 400 and not (isinstance(result, dict) and result.get("status") == "error")
+        failed = failed or not ok
+        results.append({
+            "index": index,
+            "type": step_type,
+            "ok": ok,
+            "status_code": code,
+            "result": result,
+            "elapsed_ms": round((time.monotonic() - step_started) * 1000, 1),
+        })
+    return {
+        "status": "error" if failed else "success",
+        "elapsed_ms": round((time.monotonic() - started) * 1000, 1),
+        "steps": results,
+    }
@@ -0,0 +1,111 @@
+import logging
+import threading
+import time
+
+from . import metrics
+
+logger = logging.getLogger("GameLauncher.coordinator")
+
+launch_seconds = metrics.histogram(
+    "launcher_launch_duration_seconds",
+    "Time from launch request to the game process starting (or the request failing)",
+    ("game_code", "outcome"))
+
+
+class _Flight:
+    """A spawn in progress that later requests for the same game wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+
+
+class LaunchCoordinator:
+    """Collapses duplicate launch requests and limits how many games a station runs
+
+    Concurrent requests for the same game code share one spawn and all get its
+    result; a request for a game that is already running gets a success
+    response without a second process. Requests beyond ``max_concurrent``
+    wait up to ``queue_timeout`` seconds for a slot and are rejected after
+    that. The lock only guards bookkeeping, never the spawn itself.
+    """
+
+    def __init__(self, spawn, supervisor, max_concurrent=1, queue_timeout=0.0):
+        self._spawn = spawn
+        self._supervisor = supervisor
+        self.max_concurrent = max_concurrent
+        self.queue_timeout = queue_timeout
+        self._lock = threading.Lock()
+        self._slot_freed = threading.Condition(self._lock)
+        self._inflight = {}
+        self.deduplicated = 0
+        self.rejected = 0
+        supervisor.subscribe(self._on_game_event)
+
+    def launch(self, game_code):
+        started = time.perf_counter()
+        result = self._launch(game_code)
+        if result.get("busy"):
+            outcome = "busy"
+        elif result.get("deduplicated"):
+            outcome = "deduplicated"
+        else:
+            outcome = result.get("status", "error")
+        launch_seconds.labels(game_code, outcome).observe(time.perf_counter() - started)
+        return result
+
+    def _launch(self, game_code):
+        deadline = time.monotonic() + self.queue_timeout
+        with self._lock:
+            while True:
+                owner = False
+                flight = self._inflight.get(game_code)
+                if flight is not None:
+                    self.deduplicated += 1
+                    break
+                running = self._supervisor.find(game_code)
+                if running is not None:
+                    self.deduplicated += 1
+                    return {"status": "success", "message": f"{running.name} is already running",
+                            "pid": running.pid, "deduplicated": True}
+                if self._supervisor.count() + len(self._inflight) < self.max_concurrent:
+                    flight = _Flight()
+                    self._inflight[game_code] = flight
+                    owner = True
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._slot_freed.wait(remaining):
+                    self.rejected += 1
+                    logger.warning("Rejected launch of %s: station already runs %s game(s)",
+                                   game_code, self.max_concurrent)
+                    return {"status": "error", "busy": True,
+                            "message": f"Station is busy, {self.max_concurrent} game(s) already running"}
+        if owner:
+            return self._run(game_code, flight)
+        flight.done.wait()
+        return dict(flight.result, deduplicated=True)
+
+    def _run(self, game_code, flight):
+        try:
+            flight.result = self._spawn(game_code)
+        except Exception as e:
+            flight.result = {"status": "error", "message": str(e)}
+        finally:
+            with self._lock:
+                del self._inflight[game_code]
+                self._slot_freed.notify_all()
+            flight.done.set()
+        return flight.result
+
+    def _on_game_event(self, event, game):
+        if event != "launched":
+            with self._lock:
+                self._slot_freed.notify_all()
+
+    def stats(self):
+        return {
+            "max_concurrent": self.max_concurrent,
+            "in_flight": sorted(self._inflight),
+            "deduplicated": self.deduplicated,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,120 @@
+import collections
+import itertools
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger("GameLauncher.events")
+
+
+class Subscription:
+    """One client's bounded event buffer; the oldest events are dropped when it overflows"""
+
+    def __init__(self, bus, maxlen):
+        self._bus = bus
+        self._buffer = collections.deque(maxlen=maxlen)
+        self._ready = threading.Condition()
+        self.dropped = 0
+        self.closed = False
+
+    def push(self, event):
+        with self._ready:
+            if len(self._buffer) == self._buffer.maxlen:
+                self.dropped += 1
+            self._buffer.append(event)
+            self._ready.notify()
+
+    def get(self, timeout):
+        """Next event, or None after ``timeout`` seconds without one"""
+        with self._ready:
+            if not self._buffer and not self.closed:
+                self._ready.wait(timeout)
+            return self._buffer.popleft() if self._buffer else None
+
+    def close(self):
+        with self._ready:
+            self.closed = True
+            self._ready.notify()
+        self._bus.unsubscribe(self)
+
+
+class EventBus:
+    """Fans game lifecycle events out to any number of server-sent event streams
+
+    Each subscriber has its own bounded buffer, so a slow client only loses
+    its own oldest events and never holds up publishers or other clients.
+    Recent events are kept so a reconnecting EventSource can resume from its
+    Last-Event-ID.
+    """
+
+    def __init__(self, buffer_size=100, history_size=50, heartbeat=5.0, max_subscribers=8):
+        self.buffer_size = buffer_size
+        self.heartbeat = heartbeat
+        self.max_subscribers = max_subscribers
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._history = collections.deque(maxlen=history_size)
+        self.published = 0
+
+    def publish(self, event, data):
+        with self._lock:
+            entry = (next(self._ids), event, json.dumps(data, separators=(",", ":")))
+            self._history.append(entry)
+            subscribers = list(self._subscribers)
+            self.published += 1
+        for subscription in subscribers:
+            subscription.push(entry)
+
+    def subscribe(self, last_event_id=None):
+        """Register a new stream; returns None when the subscriber limit is reached"""
+        subscription = Subscription(self, self.buffer_size)
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                return None
+            self._subscribers.add(subscription)
+            if last_event_id is not None:
+                for entry in self._history:
+                    if entry[0] > last_event_id:
+                        subscription.push(entry)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def close(self):
+        """End every open stream, e.g. when the server is draining"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.close()
+
+    def stream(self, subscription):
+        """Yield server-sent event frames until the subscription is closed"""
+        try:
+            yield f"retry: 2000\nevent: heartbeat\ndata: {self._heartbeat_data()}\n\n"
+            while not subscription.closed:
+                entry = subscription.get(self.heartbeat)
+                if entry is None:
+                    if subscription.closed:
+                        break
+                    yield f"event: heartbeat\ndata: {self._heartbeat_data()}\n\n"
+                    continue
+                event_id, event, data = entry
+                yield f"id: {event_id}\nevent: {event}\ndata: {data}\n\n"
+        finally:
+            subscription.close()
+
+    def _heartbeat_data(self):
+        return json.dumps({"status": "healthy", "time": time.time()})
+
+    def stats(self):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        return {
+            "subscribers": len(subscribers),
+            "published": self.published,
+            "dropped": sum(subscription.dropped for subscription in subscribers),
+        }
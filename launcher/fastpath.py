@@ -0,0 +1,64 @@
+import json
+
+from . import metrics
+
+fastpath_total = metrics.counter(
+    "launcher_fastpath_responses_total", "Requests answered before reaching Flask, by kind", ("kind",))
+
+# Chromium caps preflight caching at two hours
+DEFAULT_MAX_AGE = 7200
+
+
+class FastPath:
+    """WSGI middleware answering health checks and CORS preflights from prebuilt responses
+
+    ``GET``/``HEAD`` on ``health_path`` and any ``OPTIONS`` request carrying
+    ``Access-Control-Request-Method`` never reach Flask: no request hooks,
+    routing, logging or JSON encoding. Preflights allow every origin, as the
+    CORS setup of the routes does, and tell the browser to cache them for
+    ``max_age`` seconds. Everything else goes to ``app`` untouched. When
+    ``healthy`` is given and returns False, health checks get a 503.
+    """
+
+    def __init__(self, app, health_path="/health", health_body=None, max_age=DEFAULT_MAX_AGE, healthy=None):
+        self.app = app
+        self.health_path = health_path
+        self.healthy = healthy
+        self._health = self._prebuilt("200 OK", health_body or {"status": "healthy"})
+        self._unhealthy = self._prebuilt("503 Service Unavailable", {"status": "unhealthy"})
+        self._preflight_headers = [
+            ("Content-Length", "0"),
+            ("Access-Control-Allow-Origin", "*"),
+            ("Access-Control-Allow-Methods", "GET, POST, OPTIONS"),
+            ("Access-Control-Max-Age", str(max_age)),
+            ("Vary", "Origin, Access-Control-Request-Headers"),
+        ]
+        self._health_hits = fastpath_total.labels("health")
+        self._preflight_hits = fastpath_total.labels("preflight")
+
+    @staticmethod
+    def _prebuilt(status, body):
+        body = (json.dumps(body, separators=(",", ":")) + "\n").encode("utf-8")
+        return status, [
+            ("Content-Type", "application/json; charset=utf-8"),
+            ("Content-Length", str(len(body))),
+            ("Access-Control-Allow-Origin", "*"),
+            ("Cache-Control", "no-store"),
+        ], [body]
+
+    def __call__(self, environ, start_response):
+        method = environ["REQUEST_METHOD"]
+        if method == "OPTIONS" and "HTTP_ACCESS_CONTROL_REQUEST_METHOD" in environ:
+            self._preflight_hits.inc()
+            requested = environ.get("HTTP_ACCESS_CONTROL_REQUEST_HEADERS")
+            if requested:
+                start_response("200 OK", self._preflight_headers + [("Access-Control-Allow-Headers", requested)])
+            else:
+                start_response("200 OK", self._preflight_headers)
+            return []
+        if (method == "GET" or method == "HEAD") and environ["PATH_INFO"] == self.health_path:
+            self._health_hits.inc()
+            status, headers, body = self._health if self.healthy is None or self.healthy() else self._unhealthy
+            start_response(status, headers)
+            return body
+        return self.app(environ, start_response)
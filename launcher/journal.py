@@ -0,0 +1,224 @@
+import json
+import logging
+import os
+import queue
+import select
+import signal
+import threading
+import time
+
+from .terminator import HAS_PIDFD, PSUTIL_ERRORS, psutil
+
+logger = logging.getLogger("GameLauncher.journal")
+
+_boot_time = None
+
+
+def start_fingerprint(pid):
+    """The start time of ``pid``, which tells it apart from a later process reusing the PID
+
+    None if the process is gone or its start time cannot be read.
+    """
+    global _boot_time
+    if os.path.exists("/proc/stat"):
+        try:
+            if _boot_time is None:
+                with open("/proc/stat", "rb") as f:
+                    _boot_time = next(line.split()[1] for line in f if line.startswith(b"btime")).decode()
+            with open(f"/proc/{pid}/stat", "rb") as f:
+                stat = f.read()
+        except (OSError, StopIteration):
+            return None
+        # Field 22, counted from the state field that follows the command name
+        return f"{_boot_time}:{int(stat[stat.rindex(b')') + 2:].split()[19])}"
+    if psutil is not None:
+        try:
+            return f"{psutil.Process(pid).create_time():.3f}"
+        except psutil.Error:
+            return None
+    return None
+
+
+class AdoptedProcess:
+    """Popen-like handle on a game that an earlier run of the server launched
+
+    The process is not our child, so its exit code cannot be collected;
+    ``wait()`` returns None once it is gone. Raises OSError if there is no
+    way to watch the process on this platform.
+    """
+
+    def __init__(self, pid):
+        self.pid = pid
+        self.returncode = None
+        self._pidfd = None
+        self._process = None
+        if HAS_PIDFD:
+            self._pidfd = os.pidfd_open(pid)
+        elif psutil is not None:
+            self._process = psutil.Process(pid)
+        else:
+            raise OSError("Watching a process the server did not start needs psutil")
+
+    def wait(self):
+        if self._pidfd is not None:
+            select.select([self._pidfd], [], [])
+            os.close(self._pidfd)
+            self._pidfd = None
+        elif self._process is not None:
+            try:
+                self._process.wait()
+            except psutil.Error:
+                pass
+        return self.returncode
+
+    def terminate(self):
+        self._signal(hard=False)
+
+    def kill(self):
+        self._signal(hard=True)
+
+    def _signal(self, hard):
+        try:
+            if self._pidfd is not None:
+                signal.pidfd_send_signal(self._pidfd, signal.SIGKILL if hard else signal.SIGTERM)
+            elif self._process is not None:
+                self._process.kill() if hard else self._process.terminate()
+        except (OSError, *PSUTIL_ERRORS) as e:
+            logger.debug("Signal to adopted process %s failed: %s", self.pid, e)
+
+
+class StateJournal:
+    """Append-only record of running games, so a restarted server can take them back
+
+    Register ``record`` as a supervisor listener. Launches and exits are
+    queued and a writer thread appends them in batches of one write and one
+    fsync every ``flush_interval`` seconds, so a launch never waits on the
+    disk. Each start record carries the process start time, which is checked
+    on ``recover()`` so a recycled PID is never adopted. The file is
+    rewritten with just the live games once it holds ``compact_after`` lines.
+    """
+
+    def __init__(self, path, flush_interval=0.05, compact_after=1000):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.compact_after = compact_after
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._live = {}
+        self._lines = 0
+        self._thread = None
+
+    def record(self, event, game):
+        if event == "adopted":
+            return
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="state-journal", daemon=True)
+                    self._thread.start()
+        self._queue.put((event, game.pid, game.game_code, game.name, game.started_at))
+
+    def close(self):
+        """Write out whatever is queued"""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(5)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            # Let a burst of launches and exits share one write
+            time.sleep(self.flush_interval)
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write(item for item in batch if item is not None)
+            except OSError as e:
+                logger.error("Failed to write state journal %s: %s", self.path, e)
+            if None in batch:
+                return
+
+    def _write(self, items):
+        lines = []
+        with self._lock:
+            for event, pid, game_code, name, started_at in items:
+                if event == "launched":
+                    fingerprint = start_fingerprint(pid)
+                    if fingerprint is None:
+                        continue
+                    entry = {"op": "start", "pid": pid, "game_code": game_code, "name": name,
+                             "started_at": started_at, "fingerprint": fingerprint}
+                    self._live[pid] = entry
+                elif self._live.pop(pid, None) is not None:
+                    entry = {"op": "end", "pid": pid}
+                else:
+                    continue
+                lines.append(json.dumps(entry, separators=(",", ":")))
+            if not lines:
+                return
+            if self._lines + len(lines) > self.compact_after:
+                self._compact()
+                return
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._lines += len(lines)
+
+    def _compact(self):
+        # Called with the lock held
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            for entry in self._live.values():
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+        self._lines = len(self._live)
+
+    def _load(self):
+        entries = {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # A torn last line from a crash mid-write
+                        continue
+                    if entry.get("op") == "start":
+                        entries[entry["pid"]] = entry
+                    elif entry.get("op") == "end":
+                        entries.pop(entry["pid"], None)
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def recover(self, supervisor):
+        """Hand games from the journal that are still running back to ``supervisor``"""
+        started = time.monotonic()
+        entries = self._load()
+        adopted = []
+        with self._lock:
+            for pid, entry in entries.items():
+                if start_fingerprint(pid) != entry["fingerprint"]:
+                    continue
+                try:
+                    game = supervisor.adopt(entry["game_code"], AdoptedProcess(pid),
+                                            entry["name"], entry["started_at"])
+                except (OSError, *PSUTIL_ERRORS) as e:
+                    logger.warning("Cannot re-adopt %s (pid %s): %s", entry["name"], pid, e)
+                    continue
+                self._live[pid] = entry
+                adopted.append(game)
+            try:
+                self._compact()
+            except OSError as e:
+                logger.error("Failed to rewrite state journal %s: %s", self.path, e)
+        if entries:
+            logger.info("Re-adopted %s of %s journaled game(s) in %.1f ms",
+                        len(adopted), len(entries), (time.monotonic() - started) * 1000)
+        return adopted
@@ -0,0 +1,122 @@
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger("GameLauncher.keydispatch")
+
+
+class KeyDispatcher:
+    """Moves global hotkey handling off the keyboard hook thread
+
+    ``submit`` is all the hook callback does: it stamps the key and puts it
+    on a bounded queue, dropping it if the queue is full, so the OS input
+    hook is never held up. A dispatcher thread maps keys to commands with
+    ``resolve`` (None for keys that mean nothing, which are skipped
+    silently), drops a command repeated within ``debounce`` seconds (held
+    keys auto-repeat), collects whatever else arrives within ``coalesce``
+    seconds of the first key and runs only the last command of that burst
+    through ``handler``.
+    """
+
+    def __init__(self, resolve, handler, debounce=0.3, coalesce=0.05, maxsize=256):
+        self.resolve = resolve
+        self.handler = handler
+        self.debounce = debounce
+        self.coalesce = coalesce
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._last_run = {}
+        self._thread = None
+        self.submitted = 0
+        self.dropped = 0
+        self.ignored = 0
+        self.debounced = 0
+        self.coalesced = 0
+        self.dispatched = 0
+        self.failed = 0
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="key-dispatcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def submit(self, key):
+        """Called on the hook thread; never blocks"""
+        self.submitted += 1
+        try:
+            self._queue.put_nowait((key, time.monotonic()))
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            command = self._accept(*item)
+            if command is None:
+                continue
+            command, stopping = self._collect_burst(command)
+            self._dispatch(command)
+            if stopping:
+                return
+
+    def _accept(self, key, pressed_at):
+        """The command for ``key``, or None if it is unknown or a repeat"""
+        if not key:
+            self.ignored += 1
+            return None
+        command = self.resolve(key.lower())
+        if command is None:
+            self.ignored += 1
+            return None
+        last = self._last_run.get(command)
+        # Held keys keep the window open, so auto-repeat never fires twice
+        self._last_run[command] = pressed_at
+        if last is not None and pressed_at - last < self.debounce:
+            self.debounced += 1
+            return None
+        return command
+
+    def _collect_burst(self, command):
+        deadline = time.monotonic() + self.coalesce
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return command, False
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                return command, False
+            if item is None:
+                return command, True
+            later = self._accept(*item)
+            if later is not None and later != command:
+                self.coalesced += 1
+                command = later
+
+    def _dispatch(self, command):
+        self.dispatched += 1
+        try:
+            self.handler(command)
+        except Exception:
+            self.failed += 1
+            logger.exception("Error handling hotkey command %s", command)
+
+    def stats(self):
+        return {
+            "queued": self._queue.qsize(),
+            "submitted": self.submitted,
+            "dropped": self.dropped,
+            "ignored": self.ignored,
+            "debounced": self.debounced,
+            "coalesced": self.coalesced,
+            "dispatched": self.dispatched,
+            "failed": self.failed,
+        }
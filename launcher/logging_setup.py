@@ -0,0 +1,111 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+
+DEFAULT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# The queue handler and listener installed by the last setup_logging call
+_installed = None
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per record, for log shippers"""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "logger": record.name,
+            "level": record.levelname,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class BackgroundQueueHandler(logging.handlers.QueueHandler):
+    """Hands records to the writer thread without formatting them
+
+    The stock QueueHandler formats every message on the calling thread. Here
+    only tracebacks are rendered up front, because the traceback object does
+    not outlive the except block; the message itself is built by the writer.
+    Records are dropped and counted when the queue is full so a stalled disk
+    can never block a request.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def setup_logging(log_file, level=None, json_lines=None, max_bytes=None, backup_count=None,
+                  queue_size=10000):
+    """Route all logging through a queue to a background writer
+
+    Settings default to the LAUNCHER_LOG_* environment variables. Returns the
+    queue handler so callers can read its drop counter. Calling it again, as
+    building another Station does, replaces the previous handler and writer.
+    """
+    global _installed
+    level = level or os.environ.get("LAUNCHER_LOG_LEVEL", "INFO").upper()
+    if json_lines is None:
+        json_lines = os.environ.get("LAUNCHER_LOG_FORMAT", "text").lower() == "json"
+    if max_bytes is None:
+        max_bytes = int(os.environ.get("LAUNCHER_LOG_MAX_BYTES", 5 * 1024 * 1024))
+    if backup_count is None:
+        backup_count = int(os.environ.get("LAUNCHER_LOG_BACKUPS", 5))
+
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+    file_handler.setFormatter(JsonLinesFormatter() if json_lines else logging.Formatter(DEFAULT_FORMAT))
+    console_handler = logging.StreamHandler(sys.stderr)
+    console_handler.setFormatter(logging.Formatter(DEFAULT_FORMAT))
+
+    queue_handler = BackgroundQueueHandler(queue.Queue(queue_size))
+    listener = logging.handlers.QueueListener(
+        queue_handler.queue, file_handler, console_handler, respect_handler_level=True)
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    if _installed is not None:
+        _remove(*_installed)
+    root.addHandler(queue_handler)
+    listener.start()
+    _installed = queue_handler, listener
+    # Flush whatever is still queued when the server exits
+    atexit.register(listener.stop)
+    return queue_handler
+
+
+def _remove(queue_handler, listener):
+    logging.getLogger().removeHandler(queue_handler)
+    atexit.unregister(listener.stop)
+    # Writes out what is still queued before the files are closed
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+
+
+def debug_routes():
+    """Routes whose request bodies are captured when DEBUG logging is on"""
+    routes = os.environ.get("LAUNCHER_DEBUG_ROUTES", "")
+    return frozenset(route.strip() for route in routes.split(",") if route.strip())
@@ -0,0 +1,199 @@
+import logging
+import queue
+import threading
+import time
+
+from . import metrics
+from . import tracing
+
+logger = logging.getLogger("GameLauncher.notifier")
+
+notifications_total = metrics.counter(
+    "launcher_notifier_notifications_total",
+    "Commands handled per Electron listener by outcome (sent, failed, retried, dropped, coalesced)",
+    ("target", "command", "outcome"))
+delivery_seconds = metrics.histogram(
+    "launcher_notifier_delivery_seconds",
+    "Time from queueing a command to the Electron listener answering",
+    ("target",))
+
+# Commands that only need to be delivered once no matter how often they are
+# queued before the worker gets to them
+COALESCED_COMMANDS = {"STOP_GAME"}
+
+
+class NotifierTarget:
+    """One Electron HTTP listener with its own queue, worker and keep-alive session"""
+
+    def __init__(self, name, url, send_body=True, commands=None, maxsize=64,
+                 timeout=2, retries=2, backoff=0.25):
+        self.name = name
+        self.url = url
+        self.send_body = send_body
+        self.commands = set(commands) if commands else None
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._session = None
+        self._thread = None
+
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.last_error = None
+
+    def accepts(self, command):
+        return self.commands is None or command in self.commands
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name=f"notifier-{self.name}", daemon=True)
+            self._thread.start()
+
+    def put(self, command):
+        """Queue a command without blocking; returns False if it was dropped"""
+        with self._lock:
+            if command in COALESCED_COMMANDS:
+                if command in self._pending:
+                    self.coalesced += 1
+                    notifications_total.labels(self.name, command, "coalesced").inc()
+                    return True
+                self._pending.add(command)
+        try:
+            # The caller's span, so delivery shows up in the same trace
+            self._queue.put_nowait((command, time.monotonic(), tracing.tracer.current()))
+            return True
+        except queue.Full:
+            with self._lock:
+                self._pending.discard(command)
+                self.dropped += 1
+            notifications_total.labels(self.name, command, "dropped").inc()
+            logger.warning("Notifier queue for %s is full, dropped %s", self.name, command)
+            return False
+
+    def stop(self):
+        if self._thread is not None:
+            self._queue.put(None)
+
+    def join(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        # Imported here rather than at the top; it is one of the slowest imports at server start
+        import requests
+        self._session = requests.Session()
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            command, queued_at, parent = item
+            with self._lock:
+                self._pending.discard(command)
+            with tracing.span(f"notify {self.name}", parent=parent, command=command) as span:
+                self._deliver(command, queued_at, span.trace_id)
+        self._session.close()
+
+    def _deliver(self, command, queued_at, trace_id=None):
+        import requests
+        data = command if self.send_body else None
+        headers = {tracing.TRACE_HEADER: trace_id} if trace_id else None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self.retried += 1
+                notifications_total.labels(self.name, command, "retried").inc()
+                time.sleep(self.backoff * (2 ** (attempt - 1)))
+            try:
+                response = self._session.post(self.url, data=data, headers=headers, timeout=self.timeout)
+                latency = time.monotonic() - queued_at
+                self.sent += 1
+                self.latency_total += latency
+                self.latency_max = max(self.latency_max, latency)
+                notifications_total.labels(self.name, command, "sent").inc()
+                delivery_seconds.labels(self.name).observe(latency)
+                logger.info("Sent %s to %s (%s), response: %s", command, self.name, self.url, response.status_code)
+                return True
+            except requests.RequestException as e:
+                self.last_error = str(e)
+        self.failed += 1
+        notifications_total.labels(self.name, command, "failed").inc()
+        logger.error("Error sending %s to %s (%s): %s", command, self.name, self.url, self.last_error)
+        return False
+
+    def stats(self):
+        return {
+            "url": self.url,
+            "queued": self._queue.qsize(),
+            "sent": self.sent,
+            "failed": self.failed,
+            "retried": self.retried,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "latency_avg_ms": round(self.latency_total / self.sent * 1000, 2) if self.sent else None,
+            "latency_max_ms": round(self.latency_max * 1000, 2),
+            "last_error": self.last_error,
+        }
+
+
+class ElectronNotifier:
+    """Delivers commands to the Electron app in the background
+
+    Every target gets its own worker thread, so the regular listener on 5005
+    and the dedicated stop endpoint on 5006 are contacted concurrently and a
+    dead listener never holds up the HTTP handler that queued the command.
+    """
+
+    def __init__(self, targets=None):
+        if targets is None:
+            targets = default_targets()
+        self.targets = list(targets)
+        self._started = False
+        self._start_lock = threading.Lock()
+
+    def start(self):
+        # Threads are started lazily so the Werkzeug reloader parent, which
+        # never serves requests, does not spin up idle workers
+        with self._start_lock:
+            if not self._started:
+                for target in self.targets:
+                    target.start()
+                self._started = True
+
+    def notify(self, command):
+        """Queue a command for every target that accepts it"""
+        self.start()
+        queued = False
+        for target in self.targets:
+            if target.accepts(command):
+                queued = target.put(command) or queued
+        return queued
+
+    def close(self, timeout=5):
+        """Stop the workers after they drain what is already queued"""
+        if not self._started:
+            return
+        for target in self.targets:
+            target.stop()
+        for target in self.targets:
+            target.join(timeout)
+
+    def stats(self):
+        return {target.name: target.stats() for target in self.targets}
+
+
+def default_targets(host="localhost"):
+    """The two listeners the Electron main process opens"""
+    return [
+        NotifierTarget("electron", f"http://{host}:5005"),
+        NotifierTarget("electron-stop", f"http://{host}:5006/stop",
+                       send_body=False, commands={"STOP_GAME"}),
+    ]
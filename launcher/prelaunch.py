@@ -0,0 +1,330 @@
+import collections
+import json
+import logging
+import os
+import signal
+import subprocess
+import threading
+import time
+
+from . import metrics, proctree
+from .journal import start_fingerprint
+from .terminator import IS_WINDOWS, PSUTIL_ERRORS, descendants, psutil
+
+logger = logging.getLogger("GameLauncher.prelaunch")
+
+prelaunch_total = metrics.counter(
+    "launcher_prelaunch_total", "Prelaunch pool outcomes (hit, miss, evicted, warmed)", ("outcome",))
+
+
+def _suspend_tree(pid, resume):
+    # Parent first on suspend so it cannot start anything new, children first on resume
+    pids = [pid] + descendants(pid)
+    for target in (reversed(pids) if resume else pids):
+        try:
+            if psutil is not None:
+                process = psutil.Process(target)
+                process.resume() if resume else process.suspend()
+            else:
+                os.kill(target, signal.SIGCONT if resume else signal.SIGSTOP)
+        except (OSError, *PSUTIL_ERRORS) as e:
+            logger.debug("Could not %s %s: %s", "resume" if resume else "suspend", target, e)
+
+
+def _kill_tree(pid, tree=None):
+    # SIGKILL also ends a stopped process; ``tree`` catches what is no longer below ``pid``
+    for target in descendants(pid) + [pid]:
+        try:
+            psutil.Process(target).kill() if psutil is not None else os.kill(target, signal.SIGKILL)
+        except (OSError, *PSUTIL_ERRORS):
+            pass
+    if tree is not None:
+        tree.signal(hard=True)
+
+
+def _tree_rss(pid):
+    total = 0
+    for target in [pid] + descendants(pid):
+        if psutil is not None:
+            try:
+                total += psutil.Process(target).memory_info().rss
+            except psutil.Error:
+                pass
+            continue
+        try:
+            with open(f"/proc/{target}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1]) * 1024
+                        break
+        except OSError:
+            pass
+    return total
+
+
+def available_memory():
+    """Bytes of memory available to new work, or None if unknown"""
+    if psutil is not None:
+        return psutil.virtual_memory().available
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def supported():
+    return psutil is not None or hasattr(signal, "SIGSTOP")
+
+
+class _WarmGame:
+    def __init__(self, game_code, name, process, suspend_at):
+        self.game_code = game_code
+        self.name = name
+        self.process = process
+        self.tree = proctree.attach(process)
+        self.started_at = time.time()
+        self.suspend_at = suspend_at
+        self.suspended = False
+        self.rss = 0
+
+    def to_dict(self):
+        return {"game_code": self.game_code, "pid": self.process.pid,
+                "state": "suspended" if self.suspended else "warming",
+                "rss_mb": round(self.rss / 2 ** 20, 1)}
+
+
+class PrelaunchPool:
+    """Keeps the most likely next titles started and suspended, ready to be resumed
+
+    Launches are counted over a rolling window of ``window`` launches. While
+    the station is idle the pool starts the ``size`` most popular titles that
+    are not running, lets each load for ``warmup`` seconds and then suspends
+    its whole process tree. A launch of a warm title just resumes it.
+
+    A warm game never competes with a played one: any that are still warming
+    are suspended before a real launch, warm process trees together stay
+    under ``memory_budget`` bytes (least popular evicted first), and all of
+    them are evicted while a game runs if available memory drops below
+    ``memory_reserve``, checked every ``interval`` seconds. PIDs are kept in ``state_file`` so warm games left
+    behind by a crash are killed on the next start.
+    """
+
+    def __init__(self, supervisor, registry, size=1, memory_budget=4 * 2 ** 30,
+                 memory_reserve=2 * 2 ** 30, warmup=20.0, window=50, state_file="prelaunch.json",
+                 interval=2.0):
+        self.supervisor = supervisor
+        self.registry = registry
+        self.size = size
+        self.memory_budget = memory_budget
+        self.memory_reserve = memory_reserve
+        self.warmup = warmup
+        self.interval = interval
+        self.state_file = state_file
+        self._recent = collections.deque(maxlen=window)
+        self._popularity = collections.Counter()
+        self._warm = {}
+        self._cond = threading.Condition()
+        self._refill_requested = False
+        self._closed = False
+        self._thread = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._kill_leftovers()
+        supervisor.subscribe(self._on_game_event)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="prelaunch", daemon=True)
+            self._thread.start()
+
+    def take(self, game_code):
+        """Resume and hand over the warm instance of ``game_code``, or None on a miss"""
+        with self._cond:
+            warm = self._warm.pop(game_code, None)
+            # Nothing else may keep running next to the game being launched
+            for other in self._warm.values():
+                if not other.suspended:
+                    self._suspend(other)
+            if warm is not None:
+                self._save()
+        if warm is None or warm.process.poll() is not None:
+            if warm is not None:
+                # Its launcher exited; whatever it started would keep running next to the cold launch
+                logger.info("Prelaunched %s exited, killing what is left of it", game_code)
+                self._kill(warm)
+            self.misses += 1
+            prelaunch_total.labels("miss").inc()
+            return None
+        if warm.suspended:
+            _suspend_tree(warm.process.pid, resume=True)
+        self.hits += 1
+        prelaunch_total.labels("hit").inc()
+        logger.info("Prelaunch hit: resumed %s (pid %s)", game_code, warm.process.pid)
+        return warm.process
+
+    def record_launch(self, game_code):
+        self.start()
+        with self._cond:
+            if len(self._recent) == self._recent.maxlen:
+                self._popularity[self._recent[0]] -= 1
+            self._recent.append(game_code)
+            self._popularity[game_code] += 1
+            self._cond.notify()
+
+    def close(self):
+        """Kill every warm game"""
+        with self._cond:
+            self._closed = True
+            evicted = [self._evict(warm, "shutting down") for warm in list(self._warm.values())]
+            self._cond.notify()
+        for warm in evicted:
+            self._kill(warm)
+
+    def _on_game_event(self, event, game):
+        if event == "launched":
+            with self._cond:
+                self._cond.notify()
+        elif event in ("exited", "terminated") and self.supervisor.count() == 0:
+            with self._cond:
+                self._refill_requested = True
+                self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if self._closed:
+                    return
+                now = time.monotonic()
+                for warm in list(self._warm.values()):
+                    if not warm.suspended and warm.suspend_at <= now:
+                        self._suspend(warm)
+                evicted = self._enforce_budget()
+                if self._refill_requested and self.supervisor.count() == 0:
+                    self._refill_requested = False
+                    self._refill()
+                if not evicted:
+                    deadlines = [warm.suspend_at for warm in self._warm.values() if not warm.suspended]
+                    timeout = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+                    if self._warm and self.supervisor.count():
+                        # Available memory is rechecked while a game runs, not just on launches and exits
+                        timeout = self.interval if timeout is None else min(timeout, self.interval)
+                    self._cond.wait(timeout)
+            # Killed without the lock, which the supervisor's exit listener needs
+            for warm in evicted:
+                self._kill(warm)
+
+    def _refill(self):
+        # Called with the lock held
+        registry = self.registry.current()
+        for game_code, count in self._popularity.most_common():
+            if count <= 0 or len(self._warm) >= self.size:
+                return
+            if game_code in self._warm or self.supervisor.find(game_code) is not None:
+                continue
+            game = registry.get(game_code)
+            if game is None:
+                continue
+            try:
+                process = subprocess.Popen([game.path], **proctree.POPEN_KWARGS)
+            except OSError as e:
+                logger.warning("Could not prelaunch %s: %s", game.name, e)
+                continue
+            self._warm[game_code] = _WarmGame(game_code, game.executable, process,
+                                              time.monotonic() + self.warmup)
+            prelaunch_total.labels("warmed").inc()
+            logger.info("Prelaunching %s (pid %s)", game.name, process.pid)
+            self._save()
+
+    def _suspend(self, warm):
+        _suspend_tree(warm.process.pid, resume=False)
+        warm.suspended = True
+        warm.rss = _tree_rss(warm.process.pid)
+
+    def _enforce_budget(self):
+        # Called with the lock held; least popular titles go first. Returns the evicted games to kill
+        evicted = []
+        for warm in list(self._warm.values()):
+            if warm.process.poll() is not None:
+                if warm.tree is not None and warm.tree.alive():
+                    evicted.append(self._evict(warm, "its launcher exited"))
+                    continue
+                del self._warm[warm.game_code]
+                self._save()
+        by_popularity = sorted(self._warm.values(), key=lambda warm: self._popularity[warm.game_code])
+        total = sum(warm.rss for warm in by_popularity)
+        while by_popularity and total > self.memory_budget:
+            warm = by_popularity.pop(0)
+            total -= warm.rss
+            evicted.append(self._evict(warm, "over the memory budget"))
+        if self.supervisor.count() and by_popularity:
+            available = available_memory()
+            if available is not None and available < self.memory_reserve:
+                for warm in by_popularity:
+                    evicted.append(self._evict(warm, "memory is needed by the running game"))
+        return evicted
+
+    def _evict(self, warm, reason):
+        # Called with the lock held; the caller kills the returned game once it has let go of the lock
+        self._warm.pop(warm.game_code, None)
+        self.evictions += 1
+        prelaunch_total.labels("evicted").inc()
+        logger.info("Evicted prelaunched %s: %s", warm.game_code, reason)
+        self._save()
+        return warm
+
+    def _kill(self, warm):
+        try:
+            _kill_tree(warm.process.pid, warm.tree)
+            warm.process.kill()
+            warm.process.wait(5)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            logger.warning("Could not kill prelaunched %s: %s", warm.game_code, e)
+        if warm.tree is not None:
+            warm.tree.close()
+
+    def _save(self):
+        entries = [{"pid": warm.process.pid, "fingerprint": start_fingerprint(warm.process.pid)}
+                   for warm in self._warm.values()]
+        try:
+            with open(self.state_file, "w", encoding="utf-8") as f:
+                json.dump(entries, f)
+        except OSError as e:
+            logger.error("Failed to write %s: %s", self.state_file, e)
+
+    def _kill_leftovers(self):
+        try:
+            with open(self.state_file, encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return
+        for entry in entries:
+            if entry.get("fingerprint") and start_fingerprint(entry["pid"]) == entry["fingerprint"]:
+                pid = entry["pid"]
+                logger.info("Killing prelaunched game %s left behind by the previous run", pid)
+                try:
+                    # Warm games lead their own process group, see proctree.POPEN_KWARGS
+                    group = proctree.ProcessGroup(pid) if not IS_WINDOWS and os.getpgid(pid) == pid else None
+                except OSError:
+                    group = None
+                _kill_tree(pid, group)
+        self._save()
+
+    def stats(self):
+        with self._cond:
+            warm = [warm.to_dict() for warm in self._warm.values()]
+            popular = self._popularity.most_common(5)
+        lookups = self.hits + self.misses
+        return {
+            "size": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "evictions": self.evictions,
+            "warm": warm,
+            "popular": [code for code, count in popular if count > 0],
+        }
@@ -0,0 +1,155 @@
+"""Whole process trees of launched games, including processes their launcher left behind
+
+Many titles start through a small launcher that spawns the real game and
+exits. Once it is gone the game is no longer below the launched PID, so the
+tree is tracked by what the game's processes share instead: the process
+group of a game started in its own session on POSIX, a Job Object on Windows.
+"""
+import logging
+import os
+import signal
+
+from .terminator import IS_WINDOWS, PSUTIL_ERRORS, psutil
+
+logger = logging.getLogger("GameLauncher.proctree")
+
+# Keyword arguments for Popen that let ``attach`` track the whole tree
+POPEN_KWARGS = {} if IS_WINDOWS else {"start_new_session": True}
+
+
+def attach(process):
+    """A handle on the tree of a just started ``process``, or None if it cannot be tracked"""
+    try:
+        if IS_WINDOWS:
+            return JobObject(process.pid)
+        if os.getpgid(process.pid) == process.pid:
+            return ProcessGroup(process.pid)
+    except OSError as e:
+        logger.debug("Cannot track the process tree of %s: %s", process.pid, e)
+    return None
+
+
+class ProcessGroup:
+    """The processes of a POSIX process group, led by a game started with ``start_new_session``
+
+    A group ID is not handed out as a new PID while any member is alive, so
+    signalling the group never reaches an unrelated process.
+    """
+
+    def __init__(self, pgid):
+        self.pgid = pgid
+
+    def members(self):
+        """PIDs of the living processes in the group"""
+        if os.path.isdir("/proc"):
+            found = []
+            for entry in os.listdir("/proc"):
+                if not entry.isdigit():
+                    continue
+                try:
+                    with open(f"/proc/{entry}/stat", "rb") as f:
+                        stat = f.read()
+                except OSError:
+                    continue
+                # state, ppid, pgrp follow the command name, which may contain spaces
+                fields = stat[stat.rindex(b")") + 2:].split()
+                if int(fields[2]) == self.pgid and fields[0] != b"Z":
+                    found.append(int(entry))
+            return found
+        if psutil is not None:
+            found = []
+            for process in psutil.process_iter(["status"]):
+                try:
+                    if os.getpgid(process.pid) == self.pgid and process.info["status"] != psutil.STATUS_ZOMBIE:
+                        found.append(process.pid)
+                except (OSError, *PSUTIL_ERRORS):
+                    continue
+            return found
+        return [self.pgid] if self.alive() else []
+
+    def alive(self):
+        try:
+            os.killpg(self.pgid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        # Orphans that died are only reaped by whatever adopted them; zombies do not count
+        return bool(self.members()) if (os.path.isdir("/proc") or psutil is not None) else True
+
+    def signal(self, hard):
+        try:
+            os.killpg(self.pgid, signal.SIGKILL if hard else signal.SIGTERM)
+        except OSError as e:
+            logger.debug("Signal to process group %s failed: %s", self.pgid, e)
+
+    def close(self):
+        pass
+
+
+class JobObject:
+    """A Windows Job Object holding a game and everything it starts
+
+    The process is assigned right after it is started, so a child it spawns
+    within that first instant can escape the job. The job does not kill its
+    processes when the server exits, so games survive a server restart.
+    """
+
+    # JobObjectBasicProcessIdList and the access rights AssignProcessToJobObject needs
+    _PROCESS_ID_LIST = 3
+    _PROCESS_SET_QUOTA = 0x0100
+    _PROCESS_TERMINATE = 0x0001
+    _MAX_IDS = 1024
+
+    def __init__(self, pid):
+        import ctypes
+        from ctypes import wintypes
+
+        self._ctypes = ctypes
+        self._kernel32 = kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        kernel32.CreateJobObjectW.restype = wintypes.HANDLE
+        kernel32.OpenProcess.restype = wintypes.HANDLE
+        self._handle = kernel32.CreateJobObjectW(None, None)
+        if not self._handle:
+            raise ctypes.WinError(ctypes.get_last_error())
+        process = kernel32.OpenProcess(self._PROCESS_SET_QUOTA | self._PROCESS_TERMINATE, False, pid)
+        if not process:
+            error = ctypes.WinError(ctypes.get_last_error())
+            self.close()
+            raise error
+        try:
+            if not kernel32.AssignProcessToJobObject(wintypes.HANDLE(self._handle), wintypes.HANDLE(process)):
+                error = ctypes.WinError(ctypes.get_last_error())
+                self.close()
+                raise error
+        finally:
+            kernel32.CloseHandle(wintypes.HANDLE(process))
+
+    def members(self):
+        if self._handle is None:
+            return []
+        ctypes = self._ctypes
+
+        class ProcessIdList(ctypes.Structure):
+            _fields_ = [("assigned", ctypes.c_uint32), ("listed", ctypes.c_uint32),
+                        ("ids", ctypes.c_size_t * self._MAX_IDS)]
+
+        ids = ProcessIdList()
+        if not self._kernel32.QueryInformationJobObject(
+                ctypes.c_void_p(self._handle), self._PROCESS_ID_LIST,
+                ctypes.byref(ids), ctypes.sizeof(ids), None):
+            return []
+        return [int(pid) for pid in ids.ids[:ids.listed]]
+
+    def alive(self):
+        return bool(self.members())
+
+    def signal(self, hard):
+        # Windows has no polite signal for a whole job; the terminator asks processes one by one first
+        if hard and self._handle is not None:
+            self._kernel32.TerminateJobObject(self._ctypes.c_void_p(self._handle), 1)
+
+    def close(self):
+        if self._handle is not None:
+            self._kernel32.CloseHandle(self._ctypes.c_void_p(self._handle))
+            self._handle = None
@@ -0,0 +1,162 @@
+import collections
+import json
+import logging
+import os
+import threading
+import types
+
+logger = logging.getLogger("GameLauncher.registry")
+
+# Keys handled by the launcher itself that can never be assigned to a game
+RESERVED_HOTKEYS = {"x", "stop", "stop_game"}
+
+GameEntry = collections.namedtuple("GameEntry", ["code", "name", "hotkey", "path", "executable"])
+
+
+class RegistryError(ValueError):
+    pass
+
+
+class Registry:
+    """Immutable set of games indexed by code, hotkey, display name and executable name"""
+
+    def __init__(self, entries, mtime=None):
+        self.entries = tuple(entries)
+        self.mtime = mtime
+        by_code, by_hotkey, by_name, by_executable = {}, {}, {}, {}
+        for entry in self.entries:
+            for index, key, label in ((by_code, entry.code, "code"),
+                                      (by_hotkey, entry.hotkey, "hotkey"),
+                                      (by_name, entry.name.lower(), "name"),
+                                      (by_executable, entry.executable.lower(), "executable")):
+                if key is None:
+                    continue
+                if key in index:
+                    raise RegistryError(f"Duplicate {label} {key!r} for {entry.code} and {index[key].code}")
+                index[key] = entry
+        self._by_code = types.MappingProxyType(by_code)
+        self._by_hotkey = types.MappingProxyType(by_hotkey)
+        self._by_name = types.MappingProxyType(by_name)
+        self._by_executable = types.MappingProxyType(by_executable)
+
+    @classmethod
+    def from_dict(cls, data, mtime=None):
+        if not isinstance(data, dict) or not isinstance(data.get("games", []), list):
+            raise RegistryError('Expected an object with a "games" list')
+        entries = []
+        for item in data.get("games", []):
+            if not isinstance(item, dict):
+                raise RegistryError(f"Game entry is not an object: {item!r}")
+            try:
+                code = item["code"]
+                path = item["path"]
+            except KeyError as e:
+                raise RegistryError(f"Game entry is missing {e.args[0]!r}: {item}")
+            name = item.get("name", code)
+            hotkey = item.get("hotkey")
+            for field, value in (("code", code), ("path", path), ("name", name)):
+                if not isinstance(value, str) or not value:
+                    raise RegistryError(f"{field} of game entry must be a non-empty string: {item}")
+            if hotkey is not None:
+                if not isinstance(hotkey, str):
+                    raise RegistryError(f"Hotkey of {code} must be a string or null")
+                hotkey = hotkey.lower()
+                if hotkey in RESERVED_HOTKEYS:
+                    raise RegistryError(f"Hotkey {hotkey!r} for {code} is reserved")
+            executable = path.replace("\\", "/").rsplit("/", 1)[-1]
+            entries.append(GameEntry(code, name, hotkey, path, executable))
+        return cls(entries, mtime)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, game_code):
+        return game_code in self._by_code
+
+    def get(self, game_code):
+        return self._by_code.get(game_code)
+
+    def for_hotkey(self, key):
+        return self._by_hotkey.get(key)
+
+    def for_name(self, name):
+        return self._by_name.get(name.lower())
+
+    def for_executable(self, executable):
+        return self._by_executable.get(executable.lower())
+
+    def lookup(self, value):
+        """Find a game by any of its keys"""
+        return (self._by_code.get(value) or self._by_hotkey.get(value.lower())
+                or self._by_name.get(value.lower()) or self._by_executable.get(value.lower()))
+
+    def to_dict(self):
+        return {"games": [entry._asdict() for entry in self.entries]}
+
+
+class RegistryLoader:
+    """Keeps the current Registry in sync with a JSON config file
+
+    A background thread stats the file every ``interval`` seconds and swaps in
+    a freshly built Registry when its mtime changes. Readers just take the
+    current reference, so a reload never blocks or half-updates a request. A
+    file that fails to parse is logged and the previous registry stays live.
+    """
+
+    def __init__(self, path, interval=1.0):
+        self.path = path
+        self.interval = interval
+        self._registry = self._load()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def current(self):
+        if self._thread is None:
+            self.start()
+        return self._registry
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._watch, name="registry-watch", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def reload(self):
+        """Rebuild the registry if the file changed; returns True when a new one was swapped in"""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError as e:
+            logger.error("Cannot stat game registry %s: %s", self.path, e)
+            return False
+        if mtime == self._registry.mtime:
+            return False
+        try:
+            registry = self._load()
+        except (OSError, ValueError) as e:
+            logger.error("Keeping previous game registry, %s is invalid: %s", self.path, e)
+            # Remember the broken mtime so the same file is not re-parsed every interval
+            self._registry = Registry(self._registry.entries, mtime)
+            return False
+        self._registry = registry
+        logger.info("Loaded %s games from %s", len(registry), self.path)
+        return True
+
+    def _load(self):
+        mtime = os.stat(self.path).st_mtime_ns
+        with open(self.path, encoding="utf-8") as f:
+            return Registry.from_dict(json.load(f), mtime)
+
+    def _watch(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self.reload()
+            except Exception:
+                # A reload that fails in an unforeseen way must not end hot reloading
+                logger.exception("Error reloading game registry %s", self.path)
@@ -0,0 +1,291 @@
+import datetime
+import ipaddress
+import logging
+import math
+import os
+
+from flask import Flask, Response, request, jsonify
+from flask_cors import CORS
+
+from . import batch, metrics, tracing
+from .admission import Rejected
+from .fastpath import FastPath
+from .logging_setup import debug_routes
+
+
+def is_loopback(address):
+    try:
+        return ipaddress.ip_address(address or "").is_loopback
+    except ValueError:
+        return False
+
+
+def create_app(station, fastpath=True):
+    """The Flask app with every route of ``station``; ``fastpath`` puts FastPath in front of it"""
+    logger = station.logger
+    registry = station.registry
+    event_bus = station.event_bus
+
+    app = Flask(__name__)
+    preflight_max_age = int(os.environ.get("LAUNCHER_PREFLIGHT_MAX_AGE", "7200"))
+    CORS(app, resources={r"/*": {"origins": "*", "methods": ["GET", "POST", "OPTIONS"]}}, max_age=preflight_max_age)
+
+    # Health checks and CORS preflights are answered from prebuilt responses before Flask sees them
+    if fastpath and os.environ.get("LAUNCHER_FASTPATH", "1") != "0":
+        app.wsgi_app = FastPath(app.wsgi_app, max_age=preflight_max_age)
+
+    # Per-request spans, exported from /trace when LAUNCHER_TRACE=1 or tracing is switched on there
+    tracing.track_requests(app)
+
+    # Prometheus metrics for /metrics: per-route timings plus launch, terminate and notifier metrics
+    metrics.track_requests(app)
+
+    # Request bodies are only buffered for logging on routes listed in LAUNCHER_DEBUG_ROUTES
+    debug_route_paths = debug_routes()
+
+    @app.before_request
+    def log_request_info():
+        logger.info("Request: %s %s", request.method, request.path)
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+        logger.debug("Headers: %s", dict(request.headers))
+        if request.path in debug_route_paths:
+            try:
+                # Try to decode as UTF-8
+                body_data = request.get_data(as_text=True)
+                logger.debug("Body: %s", body_data)
+            except UnicodeDecodeError:
+                # In case of binary or non-UTF-8 data
+                logger.debug("Body: [Binary data or non-UTF-8 encoding]")
+
+    def client_id():
+        # Clients on the same machine, such as the Electron app and a kiosk browser, can tell
+        # themselves apart with X-Client-Id; a remote caller could dodge its rate limit with a
+        # new id on every request, so remote clients are their address alone
+        client = request.headers.get('X-Client-Id')
+        if client and is_loopback(request.remote_addr):
+            return f"{request.remote_addr}/{client}"
+        return request.remote_addr
+
+    def rejected(e):
+        """429 (503 if the command timed out in the queue) with Retry-After for a Rejected command"""
+        retry_after = max(1, math.ceil(e.retry_after))
+        response = jsonify({"error": str(e), "reason": e.reason, "retry_after": retry_after})
+        response.headers['Content-Type'] = 'application/json; charset=utf-8'
+        response.headers['Retry-After'] = str(retry_after)
+        return response, 503 if e.reason == "timeout" else 429
+
+    @app.route('/keypress', methods=['POST', 'OPTIONS'])
+    @tracing.traced()
+    def handle_keypress():
+        if request.method == 'OPTIONS':
+            response = jsonify({"status": "ok"})
+            response.headers.add('Access-Control-Allow-Origin', '*')
+            response.headers.add('Access-Control-Allow-Headers', 'Content-Type, Accept-Charset')
+            response.headers.add('Access-Control-Allow-Methods', 'POST')
+            return response
+
+        try:
+            logger.info("Received keypress request")
+            data = request.get_json(force=True, silent=True)  # Force decoding as JSON
+
+            if not data:
+                logger.warning("No data received in request")
+                return jsonify({"error": "No data received"}), 400
+            if not isinstance(data, dict) or not isinstance(data.get('key', ''), str):
+                logger.warning("Malformed keypress request")
+                return jsonify({"error": "Expected a JSON object with a string key"}), 400
+
+            result, code = station.admission.call(client_id(), station.command_class(data), station.run_keypress, data)
+            response = jsonify(result)
+            response.headers['Content-Type'] = 'application/json; charset=utf-8'
+            return response, code
+
+        except Rejected as e:
+            return rejected(e)
+        except Exception as e:
+            logger.error("Error processing keypress: %s", e)
+            response = jsonify({"error": str(e)})
+            response.headers['Content-Type'] = 'application/json; charset=utf-8'
+            return response, 500
+
+    @app.route('/close', methods=['POST'])
+    def handle_close():
+        logger.info("[≡ƒÆÇ] Terminating all games...")
+        try:
+            data = request.get_json(force=True) if request.get_data() else {}
+            result, code = station.admission.call(client_id(), "stop", station.run_close, data)
+            response = jsonify(result)
+            response.headers['Content-Type'] = 'application/json; charset=utf-8'
+            return response, code
+        except Rejected as e:
+            return rejected(e)
+        except Exception as e:
+            logger.error("Error processing close command: %s", e)
+            response = jsonify({"error": str(e)})
+            response.headers['Content-Type'] = 'application/json; charset=utf-8'
+            return response, 500
+
+    @app.route('/batch', methods=['POST'])
+    def handle_batch():
+        """Run an ordered list of keypress/close/stop commands and answer with every step's result"""
+        try:
+            steps, stop_on_error = batch.parse(request.get_json(force=True, silent=True))
+        except ValueError as e:
+            response = jsonify({"error": str(e)})
+            response.headers['Content-Type'] = 'application/json; charset=utf-8'
+            return response, 400
+
+        try:
+            station.admission.admit(client_id(), "batch")
+        except Rejected as e:
+            return rejected(e)
+
+        logger.info("Running batch of %s step(s)", len(steps))
+        result = batch.run_batch(steps, station.batch_handlers, stop_on_error)
+        response = jsonify(result)
+        response.headers['Content-Type'] = 'application/json; charset=utf-8'
+        return response, 200
+
+    @app.route('/health', methods=['GET', 'OPTIONS'])
+    def health_check():
+        """Health check endpoint to verify server is running"""
+        if request.method == 'OPTIONS':
+            response = jsonify({"status": "healthy"})
+            response.headers.add('Access-Control-Allow-Origin', '*')
+            response.headers.add('Access-Control-Allow-Headers', '*')
+            response.headers.add('Access-Control-Allow-Methods', '*')
+            return response, 200
+
+        response = jsonify({"status": "healthy"})
+        response.headers['Content-Type'] = 'application/json; charset=utf-8'
+        return response, 200
+
+    @app.route('/stop', methods=['GET', 'POST'])
+    def stop_game():
+        """Endpoint to handle STOP_GAME command"""
+        logger.info("[≡ƒÆÇ] Terminating all games...")
+
+        try:
+            result, _ = station.admission.call(client_id(), "stop", station.run_close, {})
+        except Rejected as e:
+            return rejected(e)
+
+        response = jsonify(result)
+        response.headers['Content-Type'] = 'application/json; charset=utf-8'
+        return response, 200
+
+    @app.route('/games', methods=['GET'])
+    def list_games():
+        """Games currently loaded from the registry file"""
+        response = jsonify(registry.current().to_dict())
+        response.headers['Content-Type'] = 'application/json; charset=utf-8'
+        return response, 200
+
+    @app.route('/games/<code>/stats', methods=['GET'])
+    def game_stats(code):
+        """CPU, memory and thread samples of the running or last run of a game"""
+        stats = station.sampler.stats(code.upper()) if station.sampler is not None else None
+        if stats is None:
+            response = jsonify({"error": f"No samples for game code: {code}"})
+            response.headers['Content-Type'] = 'application/json; charset=utf-8'
+            return response, 404
+        response = jsonify(stats)
+        response.headers['Content-Type'] = 'application/json; charset=utf-8'
+        return response, 200
+
+    @app.route('/status', methods=['GET'])
+    def status():
+        """Currently running and recently finished games"""
+        response = jsonify(station.status())
+        response.headers['Content-Type'] = 'application/json; charset=utf-8'
+        return response, 200
+
+    @app.route('/sessions', methods=['GET'])
+    def sessions():
+        """Active and recently ended play sessions"""
+        response = jsonify(station.sessions.stats())
+        response.headers['Content-Type'] = 'application/json; charset=utf-8'
+        return response, 200
+
+    @app.route('/sessions/report', methods=['GET'])
+    def session_report():
+        """Completed sessions of ?date=YYYY-MM-DD (default today), summed per game"""
+        try:
+            day = datetime.date.fromisoformat(request.args['date']) if 'date' in request.args else None
+        except ValueError:
+            response = jsonify({"error": "date must be YYYY-MM-DD"})
+            response.headers['Content-Type'] = 'application/json; charset=utf-8'
+            return response, 400
+        response = jsonify(station.sessions.report(day))
+        response.headers['Content-Type'] = 'application/json; charset=utf-8'
+        return response, 200
+
+    @app.route('/sessions/<session_id>/<any(extend, pause, resume):action>', methods=['POST'])
+    def change_session(session_id, action):
+        """Extend ({"seconds": N}), pause or resume a session; "current" is the latest active one"""
+        try:
+            if action == 'extend':
+                data = request.get_json(force=True, silent=True)
+                seconds = data.get('seconds') if isinstance(data, dict) else None
+                session = station.sessions.extend(session_id, seconds)
+            elif action == 'pause':
+                session = station.sessions.pause(session_id)
+            else:
+                session = station.sessions.resume(session_id)
+        except KeyError:
+            response, code = jsonify({"error": f"No active session: {session_id}"}), 404
+        except ValueError as e:
+            response, code = jsonify({"error": str(e)}), 400 if action == 'extend' else 409
+        else:
+            response, code = jsonify(session.to_dict()), 200
+        response.headers['Content-Type'] = 'application/json; charset=utf-8'
+        return response, code
+
+    @app.route('/events', methods=['GET'])
+    def event_stream():
+        """Server-sent events: liveness heartbeats plus launched/exited/terminated game events"""
+        last_event_id = request.headers.get('Last-Event-ID', '')
+        subscription = event_bus.subscribe(int(last_event_id) if last_event_id.isdigit() else None)
+        if subscription is None:
+            response = jsonify({"error": "Too many event subscribers"})
+            response.headers['Content-Type'] = 'application/json; charset=utf-8'
+            return response, 503
+
+        response = Response(event_bus.stream(subscription), mimetype='text/event-stream')
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
+
+    @app.route('/metrics', methods=['GET'])
+    def metrics_endpoint():
+        """Counters and latency histograms in Prometheus text format"""
+        return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+    @app.route('/trace', methods=['GET', 'POST'])
+    def trace():
+        """Recorded spans as Chrome trace-event JSON; POST {"enabled": true|false, "clear": true} to control"""
+        if request.method == 'POST':
+            data = request.get_json(silent=True) or {}
+            if not isinstance(data, dict):
+                response = jsonify({"error": "Expected a JSON object"})
+                response.headers['Content-Type'] = 'application/json; charset=utf-8'
+                return response, 400
+            if 'enabled' in data:
+                tracing.tracer.enabled = bool(data['enabled'])
+            if data.get('clear'):
+                tracing.tracer.clear()
+            response = jsonify({"enabled": tracing.tracer.enabled})
+        else:
+            response = jsonify(tracing.tracer.export(request.args.get('trace_id')))
+        response.headers['Content-Type'] = 'application/json; charset=utf-8'
+        return response, 200
+
+    @app.route('/notifier', methods=['GET'])
+    def notifier_stats():
+        """Delivery counters and latency for commands sent to the Electron app"""
+        response = jsonify(station.notifier.stats())
+        response.headers['Content-Type'] = 'application/json; charset=utf-8'
+        return response, 200
+
+    return app
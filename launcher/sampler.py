@@ -0,0 +1,235 @@
+import array
+import collections
+import logging
+import os
+import threading
+import time
+
+from . import metrics
+from .terminator import psutil
+
+logger = logging.getLogger("GameLauncher.sampler")
+
+watchdog_total = metrics.counter(
+    "launcher_watchdog_terminations_total", "Games the watchdog terminated, by reason", ("game_code", "reason"))
+
+if hasattr(os, "sysconf"):
+    _CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+def supported():
+    return psutil is not None or os.path.isdir("/proc")
+
+
+def process_table():
+    """{pid: (ppid, cpu_seconds, rss_bytes, threads)} for every process, in one pass"""
+    table = {}
+    if psutil is not None:
+        for process in psutil.process_iter(["ppid", "cpu_times", "memory_info", "num_threads"]):
+            info = process.info
+            if info["cpu_times"] is None or info["memory_info"] is None:
+                continue
+            table[process.pid] = (info["ppid"], info["cpu_times"].user + info["cpu_times"].system,
+                                  info["memory_info"].rss, info["num_threads"] or 0)
+        return table
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "rb") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # Fields from the state (field 3) on; the command name may contain spaces
+        fields = stat[stat.rindex(b")") + 2:].split()
+        table[int(entry)] = (int(fields[1]), (int(fields[11]) + int(fields[12])) / _CLOCK_TICKS,
+                             int(fields[21]) * _PAGE_SIZE, int(fields[17]))
+    return table
+
+
+class SampleRing:
+    """Fixed-size ring of samples in preallocated arrays, oldest overwritten first"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.times = array.array("d", bytes(8 * capacity))
+        self.cpu = array.array("d", bytes(8 * capacity))
+        self.rss = array.array("d", bytes(8 * capacity))
+        self.threads = array.array("d", bytes(8 * capacity))
+        self.processes = array.array("d", bytes(8 * capacity))
+        self.next = 0
+        self.count = 0
+
+    def append(self, when, cpu, rss, threads, processes):
+        i = self.next
+        self.times[i] = when
+        self.cpu[i] = cpu
+        self.rss[i] = rss
+        self.threads[i] = threads
+        self.processes[i] = processes
+        self.next = (i + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def rows(self):
+        start = (self.next - self.count) % self.capacity
+        rows = []
+        previous = None
+        for n in range(self.count):
+            i = (start + n) % self.capacity
+            row = {
+                "time": self.times[i],
+                "cpu_seconds": round(self.cpu[i], 3),
+                "cpu_percent": None,
+                "rss_mb": round(self.rss[i] / 2 ** 20, 1),
+                "threads": int(self.threads[i]),
+                "processes": int(self.processes[i]),
+            }
+            if previous is not None and self.times[i] > self.times[previous]:
+                row["cpu_percent"] = round(
+                    (self.cpu[i] - self.cpu[previous]) / (self.times[i] - self.times[previous]) * 100, 1)
+            rows.append(row)
+            previous = i
+        return rows
+
+
+class _Series:
+    def __init__(self, game, capacity):
+        self.game = game
+        self.ring = SampleRing(capacity)
+        self.last_cpu = None
+        self.last_progress = time.monotonic()
+        self.violation = None
+
+
+class ResourceSampler:
+    """Samples CPU time, RSS and thread count of every supervised game's process tree
+
+    Every ``interval`` seconds one pass over the process table covers all
+    running games, and each game's totals go into its own fixed-size ring of
+    ``capacity`` samples. The ring of a game's last run is kept per game code
+    after it exits. The watchdog calls ``on_violation(game, reason, details)``
+    once for a game that has used less than ``min_cpu`` of a core for
+    ``hang_after`` seconds, or whose tree uses more than ``memory_limit``
+    bytes; a limit of 0 turns that check off.
+    """
+
+    def __init__(self, supervisor, interval=2.0, capacity=300, hang_after=120.0,
+                 memory_limit=0, min_cpu=0.005, on_violation=None):
+        self.supervisor = supervisor
+        self.interval = interval
+        self.capacity = capacity
+        self.hang_after = hang_after
+        self.memory_limit = memory_limit
+        self.min_cpu = min_cpu
+        self.on_violation = on_violation
+        self._lock = threading.Lock()
+        self._series = {}
+        self._by_code = {}
+        self._wake = threading.Event()
+        self._thread = None
+        supervisor.subscribe(self._on_game_event)
+
+    def _on_game_event(self, event, game):
+        if event in ("launched", "adopted"):
+            with self._lock:
+                series = self._series[game.pid] = _Series(game, self.capacity)
+                self._by_code[game.game_code] = series
+            self.start()
+        else:
+            with self._lock:
+                self._series.pop(game.pid, None)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="resource-sampler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._wake.set()
+
+    def _run(self):
+        while not self._wake.wait(self.interval):
+            try:
+                self.sample()
+            except Exception:
+                logger.exception("Resource sampling failed")
+
+    def sample(self):
+        with self._lock:
+            active = list(self._series.values())
+        if not active:
+            return
+        table = process_table()
+        children = collections.defaultdict(list)
+        for pid, (ppid, _, _, _) in table.items():
+            children[ppid].append(pid)
+        now = time.time()
+        for series in active:
+            tree = [series.game.pid]
+            if series.game.tree is not None:
+                # Processes a launcher stub left behind are no longer below the game's first PID
+                tree.extend(pid for pid in series.game.tree.members() if pid != series.game.pid)
+            # Group members are usually also children of one another; count each process once
+            seen = set(tree)
+            for pid in tree:
+                for child in children.get(pid, ()):
+                    if child not in seen:
+                        seen.add(child)
+                        tree.append(child)
+            cpu = rss = threads = processes = 0
+            for pid in tree:
+                row = table.get(pid)
+                if row is not None:
+                    cpu += row[1]
+                    rss += row[2]
+                    threads += row[3]
+                    processes += 1
+            if not processes:
+                continue
+            series.ring.append(now, cpu, rss, threads, processes)
+            self._check(series, cpu, rss)
+
+    def _check(self, series, cpu, rss):
+        now = time.monotonic()
+        if series.last_cpu is None or cpu - series.last_cpu > self.min_cpu * self.interval:
+            series.last_progress = now
+        series.last_cpu = cpu
+        if series.violation is not None or series.game.terminating:
+            return
+        if self.hang_after and now - series.last_progress >= self.hang_after:
+            self._violate(series, "hung", {"idle_s": round(now - series.last_progress, 1)})
+        elif self.memory_limit and rss > self.memory_limit:
+            self._violate(series, "memory", {"rss_mb": round(rss / 2 ** 20, 1),
+                                             "limit_mb": round(self.memory_limit / 2 ** 20, 1)})
+
+    def _violate(self, series, reason, details):
+        series.violation = dict(details, reason=reason)
+        game = series.game
+        logger.error("Watchdog: %s (pid %s) %s: %s", game.name, game.pid, reason, details)
+        watchdog_total.labels(game.game_code, reason).inc()
+        if self.on_violation is not None:
+            self.on_violation(game, reason, details)
+
+    def stats(self, game_code):
+        """Samples of the running or most recent run of ``game_code``, or None if it never ran"""
+        with self._lock:
+            series = self._by_code.get(game_code)
+            if series is None:
+                return None
+            samples = series.ring.rows()
+        return {
+            "game_code": game_code,
+            "pid": series.game.pid,
+            "state": series.game.to_dict()["state"],
+            "interval_s": self.interval,
+            "samples": samples,
+            "latest": samples[-1] if samples else None,
+            "watchdog": {
+                "cpu_idle_s": round(time.monotonic() - series.last_progress, 1) if series.game.running else None,
+                "hang_after_s": self.hang_after or None,
+                "memory_limit_mb": round(self.memory_limit / 2 ** 20, 1) if self.memory_limit else None,
+                "violation": series.violation,
+            },
+        }
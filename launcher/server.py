@@ -0,0 +1,457 @@
+"""The launcher server: runs and supervises the games of one station
+
+    python -m launcher                          # what app.py ran
+    python -m launcher --profile game_launcher  # plus system-wide hotkeys, as game_launcher.py did
+
+The station is built from standard-library modules only and starts
+answering /health as soon as its port is bound. The Flask app is built on a
+background thread (requests to other routes wait for it), the Electron
+notifier imports requests on its worker thread and the keyboard hook is set
+up after the server is listening.
+"""
+import argparse
+import collections
+import functools
+import logging
+import os
+import sys
+import threading
+
+from . import metrics, tracing
+from . import prelaunch as prelaunch_pool
+from . import sampler as resource_sampler
+from .admission import DEFAULT_LIMITS, AdmissionControl, parse_limit
+from .coordinator import LaunchCoordinator
+from .events import EventBus
+from .fastpath import FastPath
+from .journal import StateJournal
+from .keydispatch import KeyDispatcher
+from .logging_setup import setup_logging
+from .notifier import ElectronNotifier
+from .registry import RegistryLoader
+from .serving import DeferredApp, serve
+from .sessions import SessionEngine
+from .supervisor import ProcessSupervisor
+from .terminator import TerminationEngine
+
+# Games, their executables and hotkeys live in games.json and are reloaded when it changes
+GAMES_FILE = os.environ.get(
+    "LAUNCHER_GAMES_FILE",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "games.json"))
+
+Profile = collections.namedtuple("Profile", "log_file logger state_prefix hotkeys")
+
+# The two servers this package replaces, kept apart so their logs and state files do not mix
+PROFILES = {
+    "app": Profile("app.log", "GameLauncherApp", "app", hotkeys=False),
+    "game_launcher": Profile("game_launcher.log", "GameLauncher", "game_launcher", hotkeys=True),
+}
+
+_keyboard = None
+
+
+def keyboard():
+    """The keyboard module, imported on first use; on Windows importing it already talks to the OS"""
+    global _keyboard
+    if _keyboard is None:
+        import keyboard as module
+        _keyboard = module
+    return _keyboard
+
+
+class Station:
+    """Everything the server of one station owns: registry, game processes, events and notifications"""
+
+    def __init__(self, profile="app"):
+        self.profile = PROFILES[profile]
+
+        # Set up logging; records are written to disk by a background thread
+        self.log_handler = setup_logging(self.profile.log_file)
+        self.logger = logging.getLogger(self.profile.logger)
+
+        self.registry = RegistryLoader(GAMES_FILE)
+
+        # Owns every launched game and reaps it when it exits
+        self.supervisor = ProcessSupervisor()
+        self.terminator = TerminationEngine(self.supervisor)
+
+        # Collapses duplicate launches and caps how many games run on this station
+        self.launch_coordinator = LaunchCoordinator(
+            self.spawn_game,
+            self.supervisor,
+            max_concurrent=int(os.environ.get("LAUNCHER_MAX_GAMES", "1")),
+            queue_timeout=float(os.environ.get("LAUNCHER_LAUNCH_QUEUE_TIMEOUT", "0")),
+        )
+
+        # Journal of running games, so a restarted server takes them back instead of losing track
+        self.journal = StateJournal(
+            os.environ.get("LAUNCHER_STATE_FILE", f"{self.profile.state_prefix}_state.jsonl"))
+        self.supervisor.subscribe(self.journal.record)
+
+        # Optional pool of the most played titles, started and suspended while the station is idle
+        self.prelaunch = None
+        if int(os.environ.get("LAUNCHER_PRELAUNCH", "0")) > 0 and prelaunch_pool.supported():
+            self.prelaunch = prelaunch_pool.PrelaunchPool(
+                self.supervisor, self.registry,
+                size=int(os.environ["LAUNCHER_PRELAUNCH"]),
+                memory_budget=int(os.environ.get("LAUNCHER_PRELAUNCH_MEMORY_MB", "4096")) * 2 ** 20,
+                memory_reserve=int(os.environ.get("LAUNCHER_PRELAUNCH_RESERVE_MB", "2048")) * 2 ** 20,
+                warmup=float(os.environ.get("LAUNCHER_PRELAUNCH_WARMUP", "20")),
+                state_file=os.environ.get(
+                    "LAUNCHER_PRELAUNCH_STATE_FILE", f"{self.profile.state_prefix}_prelaunch.json"),
+                interval=float(os.environ.get("LAUNCHER_SAMPLE_INTERVAL", "2")),
+            )
+
+        # CPU, memory and thread samples of every running game's process tree, plus a
+        # watchdog that stops games that hang or go over the memory ceiling
+        self.sampler = None
+        if resource_sampler.supported():
+            self.sampler = resource_sampler.ResourceSampler(
+                self.supervisor,
+                interval=float(os.environ.get("LAUNCHER_SAMPLE_INTERVAL", "2")),
+                capacity=int(os.environ.get("LAUNCHER_SAMPLE_HISTORY", "300")),
+                hang_after=float(os.environ.get("LAUNCHER_WATCHDOG_HANG", "120")),
+                memory_limit=int(os.environ.get("LAUNCHER_WATCHDOG_MEMORY_MB", "0")) * 2 ** 20,
+                on_violation=self.stop_unhealthy_game,
+            )
+
+        # Pushes game lifecycle events and heartbeats to /events subscribers
+        self.event_bus = EventBus()
+        self.supervisor.subscribe(lambda event, game: self.event_bus.publish(event, game.to_dict()))
+
+        # Background delivery of commands to the Electron app
+        self.notifier = ElectronNotifier()
+
+        # Paid play time of each launch, stopped on the server when it runs out and kept in a ledger
+        self.session_duration = float(os.environ.get("LAUNCHER_SESSION_MINUTES", "0")) * 60
+        self.sessions = SessionEngine(
+            self.expire_session,
+            os.environ.get("LAUNCHER_SESSION_LEDGER", f"{self.profile.state_prefix}_sessions.jsonl"),
+            max_duration=float(os.environ.get("LAUNCHER_SESSION_MAX_MINUTES", "720")) * 60)
+        self.supervisor.subscribe(self.sessions.record)
+        self.sessions.subscribe(lambda event, session: self.event_bus.publish(event, session.to_dict()))
+
+        # Per-client rate limits on command routes, and one worker that injects keys and runs
+        # launches and terminations in arrival order so they never fight over window focus
+        self.admission = AdmissionControl(
+            limits={name: parse_limit(os.environ.get(f"LAUNCHER_RATE_{name.upper()}"), default)
+                    for name, default in DEFAULT_LIMITS.items()},
+            queue_size=int(os.environ.get("LAUNCHER_COMMAND_QUEUE", "32")),
+            timeout=float(os.environ.get("LAUNCHER_COMMAND_TIMEOUT", "30")),
+            enabled=os.environ.get("LAUNCHER_ADMISSION", "1") != "0",
+        )
+
+        # Hotkeys are handled on the dispatcher thread so the global keyboard hook never waits
+        self.key_dispatcher = None
+        if self.profile.hotkeys:
+            self.key_dispatcher = KeyDispatcher(
+                self.resolve_key,
+                functools.partial(self.admission.run, self.run_key_command, command_class="hotkey"),
+                debounce=float(os.environ.get("LAUNCHER_KEY_DEBOUNCE", "0.3")),
+                coalesce=float(os.environ.get("LAUNCHER_KEY_COALESCE", "0.05")),
+            )
+
+        # Step types /batch accepts, dispatched to the same code as the single-command routes
+        self.batch_handlers = {
+            "keypress": functools.partial(self.admission.run, self.run_keypress, command_class="key"),
+            "close": functools.partial(self.admission.run, self.run_close, command_class="stop"),
+            "stop": functools.partial(self.admission.run, self.run_close, command_class="stop"),
+        }
+
+        metrics.gauge("launcher_games_running", "Games currently running on this station",
+                      function=self.supervisor.count)
+        metrics.gauge("launcher_command_queue_depth", "Commands waiting for the input worker",
+                      function=self.admission.depth)
+        metrics.gauge("launcher_event_subscribers", "Open /events streams",
+                      function=lambda: self.event_bus.stats()["subscribers"])
+        metrics.gauge("launcher_log_records_dropped", "Log records dropped because the log queue was full",
+                      function=lambda: self.log_handler.dropped)
+
+        self._app = None
+        self._app_lock = threading.Lock()
+
+    def flask_app(self, fastpath=True):
+        """The Flask app serving this station, built on first use"""
+        with self._app_lock:
+            if self._app is None:
+                from .routes import create_app
+                self._app = create_app(self, fastpath=fastpath)
+            return self._app
+
+    @tracing.traced()
+    def notify_electron_app(self, command):
+        """Queue a command for the Electron app's HTTP listeners without waiting for delivery"""
+        return self.notifier.notify(command)
+
+    @tracing.traced()
+    def launch_game(self, game_code, duration=None):
+        """Launch a game by its code, sharing any launch of the same game already in progress
+
+        A fresh launch gets a session of ``duration`` seconds (LAUNCHER_SESSION_MINUTES
+        if None, none if that is 0) after which the game is stopped.
+        """
+        tracing.annotate(game_code=game_code)
+        result = self.launch_coordinator.launch(game_code)
+        duration = self.session_duration if duration is None else duration
+        if duration > 0 and result.get("status") == "success" and not result.get("deduplicated"):
+            game = self.supervisor.find(game_code)
+            if game is not None:
+                result["session"] = self.sessions.start(game, duration).to_dict()
+        return result
+
+    def spawn_game(self, game_code):
+        """Start a game process by its code"""
+        game = self.registry.current().get(game_code)
+        if game is not None:
+            executable_path = game.path
+            game_name = game.name
+
+            launch_message = f"[≡ƒÄ«] Launched: {executable_path}"
+            self.logger.info(launch_message)
+
+            try:
+                # Resume a warm instance from the prelaunch pool, or launch the game and hand it to the supervisor
+                process = self.prelaunch.take(game_code) if self.prelaunch is not None else None
+                if process is not None:
+                    self.supervisor.track(game_code, process, game.executable)
+                else:
+                    with tracing.span("popen", game_code=game_code):
+                        self.supervisor.spawn(game_code, [executable_path], name=game.executable)
+                if self.prelaunch is not None:
+                    self.prelaunch.record_launch(game_code)
+
+                result = {"status": "success", "message": launch_message}
+                if process is not None:
+                    result["prelaunched"] = True
+                return result
+            except Exception as e:
+                error_message = f"[≡ƒöÑ] Error launching {game_name}: {str(e)}"
+                self.logger.error(error_message)
+                return {"status": "error", "message": error_message}
+        else:
+            return {"status": "error", "message": f"Unknown game code: {game_code}"}
+
+    @tracing.traced()
+    def terminate_games(self):
+        """Terminate all running games"""
+        self.logger.info("[≡ƒÆÇ] Terminating all games...")
+
+        # Try to close using Alt+F4 for any active window
+        with tracing.span("alt+f4"):
+            keyboard().press_and_release('alt+f4')
+
+        # Terminate every tracked game and its child processes, killing stragglers
+        with tracing.span("terminate processes"):
+            result = self.terminator.terminate()
+        for process in result["processes"]:
+            self.logger.info("[≡ƒöÑ] Killed: %s (pid %s, %s after %sms)",
+                             process['name'], process['pid'], process['outcome'], process['elapsed_ms'])
+
+        if not result["station_free"]:
+            self.logger.error("[≡ƒöÑ] Some game processes survived termination")
+            return {"status": "error", "message": "[≡ƒöÑ] Some game processes survived termination", **result}
+
+        self.logger.info("[≡ƒÆÇ] All games terminated.")
+        return {"status": "success", "message": "[≡ƒÆÇ] All games terminated.", **result}
+
+    def stop_unhealthy_game(self, game, reason, details):
+        """Terminate one game the watchdog found hung or over its memory ceiling, and report it"""
+        self.logger.error("[≡ƒöÑ] Watchdog stopping %s (pid %s): %s %s", game.name, game.pid, reason, details)
+        result = self.terminator.terminate([game])
+        self.event_bus.publish("watchdog", dict(game.to_dict(), reason=reason, **details))
+        self.notify_electron_app("STOP_GAME")
+        return result
+
+    def expire_session(self, session):
+        """Queue the stop of a session's game on the input worker, so the timer thread never waits on it"""
+        self.logger.info("[≡ƒÆÇ] Time is up for %s (session %s)", session.name, session.session_id)
+        self.admission.submit(self.stop_session_game, session)
+
+    def stop_session_game(self, session):
+        """Stop the game of a session whose paid time ran out"""
+        running = self.supervisor.running()
+        if any(game.pid != session.pid for game in running):
+            # Leave the other games on a multi-game station running
+            result = self.terminator.terminate([game for game in running if game.pid == session.pid])
+        else:
+            result = self.terminate_games()
+        self.notify_electron_app("STOP_GAME")
+        return result
+
+    def run_keypress(self, data):
+        """Launch, stop or simulate a key for a /keypress body; returns (result, status code)"""
+        if not data.get('key'):
+            self.logger.warning("Key not provided in request")
+            return {"error": "Key not provided"}, 400
+        if not isinstance(data['key'], str):
+            return {"error": "key must be a string"}, 400
+
+        key = data['key'].lower()
+        command = data.get('command', f"KEY_{key.upper()}_PRESSED")
+
+        self.logger.info("Processing key: %s with command: %s", key, command)
+
+        # Handle game launch, for ``duration`` seconds of play if given
+        game = self.registry.current().for_hotkey(key)
+        if game is not None:
+            duration = data.get('duration')
+            if duration is not None:
+                try:
+                    duration = self.sessions.check(duration)
+                except ValueError as e:
+                    return {"error": str(e)}, 400
+            return self.launch_game(game.code, duration), 200
+
+        # Handle special STOP_GAME command
+        elif key == 'stop' or key == 'stop_game' or key == 'x':
+            result = self.terminate_games()
+            self.notify_electron_app("STOP_GAME")
+            return result, 200
+
+        # Default behavior - just simulate the key press
+        else:
+            self.logger.info("[≡ƒå«] Simulating keypress for: %s", key)
+            keyboard().press_and_release(key)
+
+            return {
+                "status": "success",
+                "message": f"[≡ƒå«] Key {key.upper()} pressed",
+                "key": key,
+                "command": command
+            }, 200
+
+    def command_class(self, data):
+        """The rate limit class of a /keypress body: launch, stop or key"""
+        key = str(data.get('key') or '').lower()
+        if self.registry.current().for_hotkey(key) is not None:
+            return "launch"
+        if key in ('stop', 'stop_game', 'x'):
+            return "stop"
+        return "key"
+
+    def run_close(self, data):
+        """Terminate all games for a /close body; returns (result, status code)"""
+        if data and data.get('gameName'):
+            self.logger.info("Closing game: %s", data['gameName'])
+
+        result = self.terminate_games()
+        self.notify_electron_app("STOP_GAME")
+        return result, 200
+
+    def resolve_key(self, key):
+        """The hotkey command for ``key``, or None if it is not a hotkey"""
+        game = self.registry.current().for_hotkey(key)
+        if game is not None:
+            return ("launch", game.code)
+        if key == 'x':
+            return ("stop", None)
+        return None
+
+    def run_key_command(self, command):
+        action, game_code = command
+        if action == "launch":
+            self.logger.info("Hotkey: launching %s", game_code)
+            self.launch_game(game_code)
+        else:
+            self.logger.info("Hotkey: stopping all games")
+            self.terminate_games()
+
+    def on_key_event(self, event):
+        self.key_dispatcher.submit(event.name)
+
+    def hook_keyboard(self):
+        """Start the hotkey dispatcher and register the global keyboard listener"""
+        self.key_dispatcher.start()
+        try:
+            keyboard().on_press(self.on_key_event)
+        except Exception as e:
+            self.logger.critical("Could not hook the keyboard, hotkeys are disabled: %r", e)
+            return
+        self.logger.info("Key mappings:")
+        for game in self.registry.current():
+            if game.hotkey:
+                self.logger.info("%s -> %s", game.hotkey.upper(), game.name)
+
+    def status(self):
+        """Currently running and recently finished games"""
+        return dict(self.supervisor.status(), launches=self.launch_coordinator.stats(),
+                    admission=self.admission.stats(),
+                    hotkeys=self.key_dispatcher.stats() if self.key_dispatcher is not None else None,
+                    prelaunch=self.prelaunch.stats() if self.prelaunch is not None else None)
+
+    def shutdown(self):
+        """End event streams, stop sampling, session timers and the input worker, drop warm
+        prelaunched games and write out the state journal before the server drains"""
+        self.event_bus.close()
+        self.sessions.close()
+        self.admission.close()
+        if self.sampler is not None:
+            self.sampler.stop()
+        if self.prelaunch is not None:
+            self.prelaunch.close()
+        # Last, so the launches and exits of the queued commands above are there for the next start
+        self.journal.close()
+
+
+def main(argv=None, profile=None):
+    parser = argparse.ArgumentParser(prog="python -m launcher", description="Game launcher server for one station")
+    parser.add_argument("--profile", choices=sorted(PROFILES),
+                        default=profile or os.environ.get("LAUNCHER_PROFILE", "app"),
+                        help="log and state file names, and whether to listen for hotkeys (game_launcher)")
+    # Bind to 0.0.0.0 with LAUNCHER_HOST for a fleet controller on another machine
+    parser.add_argument("--host", default=os.environ.get("LAUNCHER_HOST", "localhost"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("LAUNCHER_PORT", "5002")))
+    parser.add_argument("--debug", action="store_true", help="Werkzeug's reloader and debugger")
+    args = parser.parse_args(argv)
+
+    # Ensure stdout and stderr use UTF-8 encoding
+    for stream in (sys.stdout, sys.stderr):
+        if hasattr(stream, "reconfigure"):
+            stream.reconfigure(encoding="utf-8", errors="replace")
+
+    station = Station(args.profile)
+    logger = station.logger
+
+    logger.info("\n=== Game Launcher Server ===")
+    logger.info("Server Configuration:")
+    logger.info("- Profile: %s", args.profile)
+    logger.info("- Pass --debug for the Werkzeug reloader and debugger")
+    logger.info("- Server running on: http://%s:%s", args.host, args.port)
+    logger.info("\nEndpoints:")
+    logger.info("- POST /keypress - Send a key press")
+    logger.info("- POST /close - Close the current game")
+    logger.info("- POST /batch - Run several commands in order")
+    logger.info("- GET /health - Check server health")
+    logger.info("- POST /stop - Stop the current game")
+    logger.info("- GET /games - Games loaded from the registry file")
+    logger.info("- GET /games/<code>/stats - Resource samples and watchdog state of a game")
+    logger.info("- GET /status - Running and recently finished games")
+    logger.info("- GET /sessions - Active and recent play sessions")
+    logger.info("- POST /sessions/<id>/extend|pause|resume - Change a play session")
+    logger.info("- GET /sessions/report - Completed sessions of a day")
+    logger.info("- GET /events - Server-sent heartbeats and game events")
+    logger.info("- GET /notifier - Electron notifier delivery stats")
+    logger.info("- GET /metrics - Prometheus metrics")
+    logger.info("- GET /trace - Recorded spans as Chrome trace JSON")
+    logger.info("\nStarting server...")
+
+    station.journal.recover(station.supervisor)
+
+    try:
+        if args.debug or os.environ.get("LAUNCHER_DEBUG") == "1":
+            if station.key_dispatcher is not None:
+                station.hook_keyboard()
+            serve(station.flask_app(), host=args.host, port=args.port, debug=True, on_shutdown=station.shutdown)
+            return
+
+        # /health and preflights are answered while Flask is still being imported
+        deferred = app = DeferredApp(lambda: station.flask_app(fastpath=False))
+        if os.environ.get("LAUNCHER_FASTPATH", "1") != "0":
+            app = FastPath(deferred, max_age=int(os.environ.get("LAUNCHER_PREFLIGHT_MAX_AGE", "7200")),
+                           healthy=deferred.healthy)
+        if station.key_dispatcher is not None:
+            threading.Thread(target=station.hook_keyboard, name="keyboard-hook", daemon=True).start()
+        serve(app, host=args.host, port=args.port, debug=False, on_shutdown=station.shutdown)
+    except Exception as e:
+        logger.critical("Error starting server: %s", e)
+        raise
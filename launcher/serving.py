@@ -0,0 +1,355 @@
+import http.server
+import logging
+import os
+import queue
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+import urllib.parse
+
+logger = logging.getLogger("GameLauncher.serving")
+
+
+class _RequestBody:
+    """wsgi.input limited to the request's Content-Length"""
+
+    def __init__(self, rfile, length):
+        self._rfile = rfile
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b""
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self._rfile.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def readline(self, size=-1):
+        if self.remaining <= 0:
+            return b""
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        line = self._rfile.readline(size)
+        self.remaining -= len(line)
+        return line
+
+    def readlines(self, hint=-1):
+        return list(self)
+
+    def __iter__(self):
+        while True:
+            line = self.readline()
+            if not line:
+                return
+            yield line
+
+
+class _WSGIRequestHandler(http.server.BaseHTTPRequestHandler):
+    """Runs the WSGI app for each request on a persistent HTTP/1.1 connection"""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server_version = "GameLauncher"
+    # Largest unread request body that is skipped to keep a connection alive
+    max_drain = 64 * 1024
+
+    def setup(self):
+        self.timeout = self.server.keepalive_timeout
+        super().setup()
+        self.busy = False
+        self.server.track(self, True)
+
+    def finish(self):
+        self.server.track(self, False)
+        super().finish()
+
+    def run_wsgi(self):
+        self.busy = True
+        try:
+            self._run_wsgi()
+        finally:
+            self.busy = False
+        if self.server.draining:
+            self.close_connection = True
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = do_OPTIONS = run_wsgi
+
+    def _run_wsgi(self):
+        if "chunked" in self.headers.get("Transfer-Encoding", "").lower():
+            self.send_error(411, "Chunked request bodies are not supported")
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            self.send_error(400, "Bad Content-Length")
+            return
+        body = _RequestBody(self.rfile, length)
+        environ = self._make_environ(body)
+        state = {"status": None, "headers": None, "sent": False, "chunked": False}
+
+        def write(data):
+            if not state["sent"]:
+                self._send_headers(state, environ["REQUEST_METHOD"])
+            if not data or environ["REQUEST_METHOD"] == "HEAD":
+                return
+            if state["chunked"]:
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+            else:
+                self.wfile.write(data)
+
+        def start_response(status, headers, exc_info=None):
+            if exc_info and state["sent"]:
+                raise exc_info[1].with_traceback(exc_info[2])
+            state["status"] = status
+            state["headers"] = headers
+            return write
+
+        try:
+            result = self.server.app(environ, start_response)
+            try:
+                for data in result:
+                    write(data)
+                if not state["sent"]:
+                    write(b"")
+                if state["chunked"]:
+                    self.wfile.write(b"0\r\n\r\n")
+            finally:
+                if hasattr(result, "close"):
+                    result.close()
+        except (ConnectionError, socket.timeout):
+            self.close_connection = True
+            return
+        except Exception:
+            logger.exception("Error handling %s %s", self.command, self.path)
+            self.close_connection = True
+            if not state["sent"]:
+                self.send_error(500)
+            return
+
+        # Skip whatever the app did not read so the next request starts cleanly
+        if body.remaining:
+            if body.remaining > self.max_drain:
+                self.close_connection = True
+            else:
+                body.read()
+
+    def _send_headers(self, state, method):
+        code, _, reason = state["status"].partition(" ")
+        code = int(code)
+        self.send_response(code, reason)
+        names = set()
+        for name, value in state["headers"]:
+            names.add(name.lower())
+            self.send_header(name, value)
+        if ("content-length" not in names and method != "HEAD"
+                and code >= 200 and code not in (204, 304)):
+            state["chunked"] = True
+            self.send_header("Transfer-Encoding", "chunked")
+        if self.close_connection or self.server.draining:
+            self.close_connection = True
+            self.send_header("Connection", "close")
+        self.end_headers()
+        state["sent"] = True
+
+    def _make_environ(self, body):
+        path, _, query = self.path.partition("?")
+        environ = {
+            "REQUEST_METHOD": self.command,
+            "SCRIPT_NAME": "",
+            "PATH_INFO": urllib.parse.unquote_to_bytes(path).decode("latin-1"),
+            "QUERY_STRING": query,
+            "SERVER_NAME": self.server.server_name,
+            "SERVER_PORT": str(self.server.server_port),
+            "SERVER_PROTOCOL": self.request_version,
+            "REMOTE_ADDR": self.client_address[0],
+            "REMOTE_PORT": str(self.client_address[1]),
+            "CONTENT_TYPE": self.headers.get("Content-Type", ""),
+            "CONTENT_LENGTH": self.headers.get("Content-Length", ""),
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": "http",
+            "wsgi.input": body,
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": False,
+            "wsgi.run_once": False,
+        }
+        for name, value in self.headers.items():
+            key = "HTTP_" + name.upper().replace("-", "_")
+            if key in ("HTTP_CONTENT_TYPE", "HTTP_CONTENT_LENGTH"):
+                continue
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+        return environ
+
+    def log_message(self, format, *args):
+        logger.debug("%s - " + format, self.client_address[0], *args)
+
+
+class PooledWSGIServer(socketserver.TCPServer):
+    """HTTP/1.1 WSGI server with a fixed worker pool
+
+    Accepted connections are handed to ``workers`` threads through a bounded
+    queue; when that fills up the accept loop stops and further clients wait
+    in the listen backlog of ``backlog`` connections. Connections are kept
+    alive for ``keepalive_timeout`` idle seconds. ``drain()`` stops accepting,
+    closes idle keep-alive connections and waits for in-flight requests.
+    """
+
+    allow_reuse_address = True
+
+    def __init__(self, host, port, app, workers=16, backlog=64, keepalive_timeout=5.0):
+        # Must be set before the base class calls listen()
+        self.request_queue_size = backlog
+        self.app = app
+        self.keepalive_timeout = keepalive_timeout
+        self.draining = False
+        self._connections = queue.Queue(maxsize=workers * 2)
+        self._handlers = set()
+        self._handlers_lock = threading.Lock()
+        super().__init__((host, port), _WSGIRequestHandler)
+        self.server_name = host
+        self.server_port = self.server_address[1]
+        self._workers = [
+            threading.Thread(target=self._work, name=f"http-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def process_request(self, request, client_address):
+        while True:
+            try:
+                self._connections.put((request, client_address), timeout=0.5)
+                return
+            except queue.Full:
+                if self.draining:
+                    self.shutdown_request(request)
+                    return
+
+    def track(self, handler, opened):
+        with self._handlers_lock:
+            if opened:
+                self._handlers.add(handler)
+            else:
+                self._handlers.discard(handler)
+
+    def _work(self):
+        while True:
+            item = self._connections.get()
+            if item is None:
+                return
+            request, client_address = item
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+    def handle_error(self, request, client_address):
+        logger.exception("Unhandled error on connection from %s", client_address)
+
+    def drain(self, timeout=10.0):
+        """Finish in-flight requests, then close; call once serve_forever has returned"""
+        self.draining = True
+        deadline = time.monotonic() + timeout
+        with self._handlers_lock:
+            idle = [handler for handler in self._handlers if not handler.busy]
+        for handler in idle:
+            try:
+                handler.connection.shutdown(socket.SHUT_RD)
+            except OSError:
+                pass
+        for _ in self._workers:
+            self._connections.put(None)
+        for worker in self._workers:
+            worker.join(max(0.0, deadline - time.monotonic()))
+        busy = sum(worker.is_alive() for worker in self._workers)
+        if busy:
+            logger.warning("Shutting down with %s request(s) still running", busy)
+        self.server_close()
+
+
+class DeferredApp:
+    """WSGI app that builds the real one from ``factory`` on a background thread
+
+    Lets the server bind its port and answer fast-path requests while slow
+    imports are still running; other requests wait up to ``timeout`` seconds
+    for the app and get a 503 if it failed to build.
+    """
+
+    def __init__(self, factory, timeout=30.0):
+        self.timeout = timeout
+        self._factory = factory
+        self._app = None
+        self._failed = False
+        self._ready = threading.Event()
+        threading.Thread(target=self._build, name="app-loader", daemon=True).start()
+
+    def _build(self):
+        started = time.monotonic()
+        try:
+            self._app = self._factory()
+            logger.info("App ready in %.0f ms", (time.monotonic() - started) * 1000)
+        except Exception:
+            self._failed = True
+            logger.exception("Failed to build the app")
+        finally:
+            self._ready.set()
+
+    def healthy(self):
+        return not self._failed
+
+    def __call__(self, environ, start_response):
+        if self._app is None:
+            self._ready.wait(self.timeout)
+            if self._app is None:
+                start_response("503 Service Unavailable", [("Content-Type", "text/plain"), ("Retry-After", "1")])
+                return [b"Server is starting"]
+        return self._app(environ, start_response)
+
+
+def serve(app, host="localhost", port=5002, debug=None, on_shutdown=None):
+    """Serve ``app`` with the pooled production server, or Werkzeug's debug server when asked
+
+    Debug mode is opt-in through ``--debug`` on the command line or
+    LAUNCHER_DEBUG=1. The pool is tuned with LAUNCHER_WORKERS,
+    LAUNCHER_BACKLOG, LAUNCHER_KEEPALIVE and LAUNCHER_DRAIN_TIMEOUT.
+    ``on_shutdown`` is called before draining, to end long-lived responses.
+    """
+    if debug is None:
+        debug = "--debug" in sys.argv or os.environ.get("LAUNCHER_DEBUG") == "1"
+    if debug:
+        logger.info("Debug mode: Werkzeug reloader and debugger enabled")
+        app.run(host=host, port=port, debug=True, threaded=True)
+        return
+
+    server = PooledWSGIServer(
+        host, port, app,
+        workers=int(os.environ.get("LAUNCHER_WORKERS", 16)),
+        backlog=int(os.environ.get("LAUNCHER_BACKLOG", 64)),
+        keepalive_timeout=float(os.environ.get("LAUNCHER_KEEPALIVE", 5)),
+    )
+
+    def stop(signum, frame):
+        # shutdown() blocks until serve_forever returns, so it cannot run on this thread
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    if hasattr(signal, "SIGBREAK"):
+        signal.signal(signal.SIGBREAK, stop)
+
+    logger.info("Serving on http://%s:%s with %s workers", host, server.server_port, len(server._workers))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        logger.info("Draining open connections...")
+        if on_shutdown is not None:
+            on_shutdown()
+        server.drain(float(os.environ.get("LAUNCHER_DRAIN_TIMEOUT", 10)))
@@ -0,0 +1,333 @@
+import collections
+import datetime
+import heapq
+import itertools
+import json
+import logging
+import math
+import os
+import threading
+import time
+import uuid
+
+from . import metrics
+
+logger = logging.getLogger("GameLauncher.sessions")
+
+sessions_total = metrics.counter(
+    "launcher_sessions_total", "Completed play sessions, by how they ended", ("reason",))
+
+
+class Session:
+    """Paid play time of one launched game"""
+
+    def __init__(self, game, duration):
+        self.session_id = uuid.uuid4().hex[:12]
+        self.game_code = game.game_code
+        self.name = game.name
+        self.pid = game.pid
+        self.paid = float(duration)
+        self.started_at = time.time()
+        self.started_monotonic = time.monotonic()
+        self.deadline = self.started_monotonic + self.paid
+        self.paused_monotonic = None
+        self.paused = 0.0
+        self.ended_at = None
+        self.end_reason = None
+
+    @property
+    def state(self):
+        if self.end_reason is not None:
+            return "ended"
+        return "paused" if self.paused_monotonic is not None else "running"
+
+    def remaining(self, now=None):
+        now = time.monotonic() if now is None else now
+        if self.end_reason is not None:
+            return 0.0
+        return max(0.0, self.deadline - (self.paused_monotonic if self.paused_monotonic is not None else now))
+
+    def played(self, now=None):
+        now = time.monotonic() if now is None else now
+        paused = self.paused + (now - self.paused_monotonic if self.paused_monotonic is not None else 0.0)
+        return max(0.0, now - self.started_monotonic - paused)
+
+    def to_dict(self):
+        return {
+            "session_id": self.session_id,
+            "game_code": self.game_code,
+            "name": self.name,
+            "pid": self.pid,
+            "state": self.state,
+            "started_at": self.started_at,
+            "paid": round(self.paid, 3),
+            "remaining": round(self.remaining(), 3),
+            "played": round(self.played(), 3),
+            "ended_at": self.ended_at,
+            "reason": self.end_reason,
+        }
+
+
+class SessionEngine:
+    """Server-side play sessions that stop their game when the paid time runs out
+
+    Every running session has an entry in a heap ordered by deadline, and one
+    scheduler thread sleeps until the earliest of them, so expiry costs no
+    polling and no thread per session. Extending or resuming a session pushes
+    a new entry; pausing or ending it leaves the old one to be skipped when
+    it comes up. ``on_expire(session)`` is called on the scheduler thread
+    once a session's time is up.
+
+    Register ``record`` as a supervisor listener so a session ends when its
+    game exits. Completed sessions are appended to ``ledger_path``, one
+    compact JSON line each, which ``report()`` sums up per day.
+    """
+
+    def __init__(self, on_expire, ledger_path, max_duration=12 * 3600, history_size=20):
+        self.on_expire = on_expire
+        self.ledger_path = ledger_path
+        self.max_duration = max_duration
+        self._cond = threading.Condition()
+        self._heap = []
+        self._seq = itertools.count()
+        self._active = {}
+        self._recent = collections.deque(maxlen=history_size)
+        self._listeners = []
+        self._ledger_lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+
+    def subscribe(self, callback):
+        """Register ``callback(event, session)`` for "session_started", "session_extended",
+        "session_paused", "session_resumed" and "session_ended" events"""
+        self._listeners.append(callback)
+
+    def check(self, seconds, what="Session duration"):
+        """``seconds`` as a float; raises ValueError unless it is finite, positive and at most ``max_duration``"""
+        try:
+            seconds = float(seconds)
+        except (TypeError, ValueError):
+            raise ValueError(f"{what} must be a number of seconds") from None
+        if not math.isfinite(seconds) or not 0 < seconds <= self.max_duration:
+            raise ValueError(f"{what} must be more than 0 and at most {self.max_duration:g} seconds")
+        return seconds
+
+    def start(self, game, duration):
+        """Start the clock on ``game``, a supervisor GameProcess, for ``duration`` seconds"""
+        duration = self.check(duration)
+        session = Session(game, duration)
+        with self._cond:
+            self._ensure_thread()
+            self._active[session.session_id] = session
+            self._push(session)
+        logger.info("Session %s: %s for %ss", session.session_id, session.name, round(session.paid))
+        self._publish("session_started", session)
+        # The game may have exited before it had a session to end
+        if game.exited.is_set():
+            self.end(session.session_id, "exited")
+        return session
+
+    def get(self, session_id):
+        """An active session by id, or the most recent one for "current"; raises KeyError"""
+        with self._cond:
+            if session_id == "current":
+                if not self._active:
+                    raise KeyError(session_id)
+                return max(self._active.values(), key=lambda s: s.started_monotonic)
+            return self._active[session_id]
+
+    def extend(self, session_id, seconds):
+        """Add ``seconds`` of paid time to a session"""
+        seconds = self.check(seconds, "Extension")
+        with self._cond:
+            session = self.get(session_id)
+            if session.paid + seconds > self.max_duration:
+                raise ValueError(f"Sessions are limited to {self.max_duration:g} seconds")
+            session.paid += seconds
+            session.deadline += seconds
+            if session.paused_monotonic is None:
+                self._push(session)
+        logger.info("Session %s extended by %ss", session.session_id, round(seconds))
+        self._publish("session_extended", session)
+        return session
+
+    def pause(self, session_id):
+        """Stop a session's clock; raises ValueError if it is already paused"""
+        with self._cond:
+            session = self.get(session_id)
+            if session.paused_monotonic is not None:
+                raise ValueError("Session is already paused")
+            session.paused_monotonic = time.monotonic()
+            # Its heap entry is skipped from now on, since the session is no longer running
+        self._publish("session_paused", session)
+        return session
+
+    def resume(self, session_id):
+        """Restart a paused session's clock; raises ValueError if it is running"""
+        with self._cond:
+            session = self.get(session_id)
+            if session.paused_monotonic is None:
+                raise ValueError("Session is not paused")
+            pause = time.monotonic() - session.paused_monotonic
+            session.paused += pause
+            session.deadline += pause
+            session.paused_monotonic = None
+            self._push(session)
+        self._publish("session_resumed", session)
+        return session
+
+    def end(self, session_id, reason):
+        """Close a session and write it to the ledger; returns None if it already ended"""
+        with self._cond:
+            session = self._active.pop(session_id, None)
+            if session is None:
+                return None
+            now = time.monotonic()
+            if session.paused_monotonic is not None:
+                session.paused += now - session.paused_monotonic
+                session.paused_monotonic = None
+            session.ended_at = time.time()
+            session.end_reason = reason
+            played = session.played(now)
+            self._recent.appendleft(session)
+        sessions_total.labels(reason).inc()
+        logger.info("Session %s ended (%s) after %ss of %ss",
+                    session.session_id, reason, round(played), round(session.paid))
+        self._append({
+            "id": session.session_id,
+            "game": session.game_code,
+            "start": round(session.started_at, 3),
+            "end": round(session.ended_at, 3),
+            "paid": round(session.paid, 3),
+            "played": round(played, 3),
+            "paused": round(session.paused, 3),
+            "reason": reason,
+        })
+        self._publish("session_ended", session)
+        return session
+
+    def record(self, event, game):
+        """Supervisor listener: a game that exits or is terminated ends its session"""
+        if event not in ("exited", "terminated"):
+            return
+        with self._cond:
+            ended = [s.session_id for s in self._active.values() if s.pid == game.pid]
+        for session_id in ended:
+            self.end(session_id, "stopped" if event == "terminated" else "exited")
+
+    def active(self):
+        with self._cond:
+            return list(self._active.values())
+
+    def stats(self):
+        with self._cond:
+            return {
+                "active": [session.to_dict() for session in self._active.values()],
+                "recent": [session.to_dict() for session in self._recent],
+                "timers": len(self._heap),
+            }
+
+    def report(self, day=None):
+        """Sessions that ended on ``day`` (a date, default today, local time), summed per game"""
+        day = day or datetime.date.today()
+        games = {}
+        totals = {"sessions": 0, "paid": 0.0, "played": 0.0}
+        for entry in self._read():
+            if datetime.date.fromtimestamp(entry["end"]) != day:
+                continue
+            game = games.setdefault(entry["game"], {"sessions": 0, "paid": 0.0, "played": 0.0, "reasons": {}})
+            for summary in (game, totals):
+                summary["sessions"] += 1
+                summary["paid"] += entry["paid"]
+                summary["played"] += entry["played"]
+            game["reasons"][entry["reason"]] = game["reasons"].get(entry["reason"], 0) + 1
+        for summary in (totals, *games.values()):
+            summary["paid"] = round(summary["paid"], 3)
+            summary["played"] = round(summary["played"], 3)
+        return {"date": day.isoformat(), "games": games, **totals}
+
+    def close(self):
+        """Stop the scheduler thread; running sessions stay open in memory"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(5)
+
+    def _push(self, session):
+        # Called with the condition held
+        heapq.heappush(self._heap, (session.deadline, next(self._seq), session))
+        self._cond.notify()
+
+    def _publish(self, event, session):
+        for callback in list(self._listeners):
+            try:
+                callback(event, session)
+            except Exception as e:
+                logger.error("Error in session listener for %s: %s", event, e)
+
+    def _ensure_thread(self):
+        # Called with the condition held
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="session-timers", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                session = self._next_expired()
+                if session is None:
+                    return
+                if self.end(session.session_id, "expired") is not None:
+                    self.on_expire(session)
+            except Exception:
+                # One bad entry or a failing stop must not leave every other session without a timer
+                logger.exception("Error in session scheduler")
+
+    def _next_expired(self):
+        """Wait for the next session whose time is up; None once the engine is closed"""
+        with self._cond:
+            while True:
+                if self._closed:
+                    return None
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                deadline, _, candidate = self._heap[0]
+                try:
+                    # Entries left behind by extend, pause and end no longer match their session
+                    stale = candidate.state != "running" or candidate.deadline != deadline
+                    delay = deadline - time.monotonic()
+                except Exception:
+                    logger.exception("Dropping unusable session timer entry")
+                    stale = True
+                if stale:
+                    heapq.heappop(self._heap)
+                    continue
+                if delay > 0:
+                    self._cond.wait(min(delay, threading.TIMEOUT_MAX))
+                    continue
+                heapq.heappop(self._heap)
+                return candidate
+
+    def _append(self, entry):
+        try:
+            with self._ledger_lock, open(self.ledger_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError as e:
+            logger.error("Failed to write session ledger %s: %s", self.ledger_path, e)
+
+    def _read(self):
+        try:
+            with self._ledger_lock, open(self.ledger_path, encoding="utf-8") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return
+        for line in lines:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                # A torn last line from a crash mid-write
+                continue
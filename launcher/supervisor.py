@@ -0,0 +1,208 @@
+import collections
+import errno
+import logging
+import os
+import select
+import subprocess
+import threading
+import time
+
+from . import proctree
+
+logger = logging.getLogger("GameLauncher.supervisor")
+
+
+class GameProcess:
+    """A game the supervisor launched, alive or finished"""
+
+    def __init__(self, game_code, name, process):
+        self.game_code = game_code
+        self.name = name
+        self.process = process
+        self.pid = process.pid
+        self.started_at = time.time()
+        self.started_monotonic = time.monotonic()
+        self.ended_at = None
+        self.runtime = None
+        self.exit_code = None
+        self.terminating = False
+        self.exited = threading.Event()
+        # Process group or Job Object holding everything the game started, when it can be tracked
+        self.tree = None
+
+    @property
+    def running(self):
+        return self.ended_at is None
+
+    def to_dict(self):
+        return {
+            "game_code": self.game_code,
+            "name": self.name,
+            "pid": self.pid,
+            "started_at": self.started_at,
+            "ended_at": self.ended_at,
+            "runtime": self.runtime,
+            "exit_code": self.exit_code,
+            "state": "running" if self.running else ("terminated" if self.terminating else "exited"),
+        }
+
+
+class ProcessSupervisor:
+    """Owns every game process, reaps them as they exit and publishes state changes
+
+    On Linux exits are detected with pidfds multiplexed on a single watcher
+    thread. Elsewhere each game gets a thread blocked in ``Popen.wait()``.
+    Neither approach polls process handles. A game whose first process exits
+    while others in its process group or Job Object live on, as with launcher
+    stubs, stays running until those are gone too; only that wait polls.
+    """
+
+    def __init__(self, history_size=50):
+        self._lock = threading.Lock()
+        self._running = {}
+        self._history = collections.deque(maxlen=history_size)
+        self._listeners = []
+        self._status = {"running": [], "recent": []}
+        self._use_pidfd = hasattr(os, "pidfd_open")
+        self._watcher = None
+        self._wake_r = self._wake_w = None
+        self._new_pidfds = []
+
+    def subscribe(self, callback):
+        """Register ``callback(event, game)`` for "launched", "adopted", "exited" and "terminated" events"""
+        self._listeners.append(callback)
+
+    def spawn(self, game_code, args, name=None, **popen_kwargs):
+        """Start a game in its own process group or Job Object and begin watching it; raises whatever Popen raises"""
+        for key, value in proctree.POPEN_KWARGS.items():
+            popen_kwargs.setdefault(key, value)
+        process = subprocess.Popen(args, **popen_kwargs)
+        return self.track(game_code, process, name or os.path.basename(args[0]))
+
+    def adopt(self, game_code, process, name, started_at):
+        """Watch a game an earlier run of the server launched, given a Popen-like handle on it"""
+        return self.track(game_code, process, name, event="adopted", started_at=started_at)
+
+    def track(self, game_code, process, name, event="launched", started_at=None):
+        """Watch an already started process as a running game and publish ``event`` for it"""
+        game = GameProcess(game_code, name, process)
+        game.tree = proctree.attach(process)
+        if started_at is not None:
+            game.started_monotonic -= max(0.0, time.time() - started_at)
+            game.started_at = started_at
+        with self._lock:
+            self._running[game.pid] = game
+            self._refresh_status()
+        self._watch(game)
+        self._publish(event, game)
+        return game
+
+    def terminate(self, game):
+        """Ask a game to exit; the watcher reaps it once it does"""
+        game.terminating = True
+        game.process.terminate()
+
+    def running(self):
+        with self._lock:
+            return list(self._running.values())
+
+    def count(self):
+        return len(self._running)
+
+    def find(self, game_code):
+        with self._lock:
+            for game in self._running.values():
+                if game.game_code == game_code:
+                    return game
+        return None
+
+    def status(self):
+        """Snapshot of running and recently finished games, rebuilt only on state changes"""
+        return self._status
+
+    def _refresh_status(self):
+        # Called with the lock held
+        self._status = {
+            "running": [game.to_dict() for game in self._running.values()],
+            "recent": [game.to_dict() for game in self._history],
+        }
+
+    def _publish(self, event, game):
+        for callback in list(self._listeners):
+            try:
+                callback(event, game)
+            except Exception as e:
+                logger.error("Error in supervisor listener for %s: %s", event, e)
+
+    def _watch(self, game):
+        if self._use_pidfd:
+            try:
+                pidfd = os.pidfd_open(game.pid)
+            except OSError as e:
+                # Only a kernel without pidfds turns them off; EMFILE or an already
+                # reaped pid just puts this one game on a waiting thread
+                if e.errno == errno.ENOSYS:
+                    self._use_pidfd = False
+                else:
+                    logger.warning("Watching %s (pid %s) with a thread: %s", game.name, game.pid, e)
+            else:
+                with self._lock:
+                    self._new_pidfds.append((pidfd, game))
+                    if self._watcher is None:
+                        self._wake_r, self._wake_w = os.pipe()
+                        self._watcher = threading.Thread(
+                            target=self._watch_pidfds, name="supervisor-pidfd", daemon=True)
+                        self._watcher.start()
+                os.write(self._wake_w, b"\0")
+                return
+        threading.Thread(target=self._reap, args=(game,),
+                         name=f"supervisor-{game.pid}", daemon=True).start()
+
+    def _watch_pidfds(self):
+        poller = select.poll()
+        poller.register(self._wake_r, select.POLLIN)
+        watched = {}
+        while True:
+            for fd, _ in poller.poll():
+                if fd == self._wake_r:
+                    os.read(self._wake_r, 4096)
+                    with self._lock:
+                        new_pidfds, self._new_pidfds = self._new_pidfds, []
+                    for pidfd, game in new_pidfds:
+                        watched[pidfd] = game
+                        poller.register(pidfd, select.POLLIN)
+                    continue
+                game = watched.pop(fd)
+                poller.unregister(fd)
+                os.close(fd)
+                self._reap(game)
+
+    def _reap(self, game):
+        exit_code = game.process.wait()
+        if game.tree is not None and game.tree.alive():
+            # A launcher stub that started the real game and exited: the game runs until its tree is gone
+            logger.info("%s (pid %s) exited with code %s but left processes running", game.name, game.pid, exit_code)
+            threading.Thread(target=self._reap_tree, args=(game, exit_code),
+                             name=f"supervisor-tree-{game.pid}", daemon=True).start()
+            return
+        self._finish(game, exit_code)
+
+    def _reap_tree(self, game, exit_code, interval=0.1):
+        while game.tree.alive():
+            time.sleep(interval)
+        self._finish(game, exit_code)
+
+    def _finish(self, game, exit_code):
+        if game.tree is not None:
+            game.tree.close()
+        game.ended_at = time.time()
+        game.runtime = round(time.monotonic() - game.started_monotonic, 3)
+        game.exit_code = exit_code
+        with self._lock:
+            self._running.pop(game.pid, None)
+            self._history.appendleft(game)
+            self._refresh_status()
+        game.exited.set()
+        event = "terminated" if game.terminating else "exited"
+        logger.info("%s (pid %s) %s with code %s after %ss", game.name, game.pid, event, exit_code, game.runtime)
+        self._publish(event, game)
@@ -0,0 +1,250 @@
+import collections
+import logging
+import os
+import select
+import signal
+import subprocess
+import sys
+import time
+
+from . import metrics
+
+try:
+    import psutil
+    PSUTIL_ERRORS = (psutil.Error,)
+except ImportError:
+    psutil = None
+    PSUTIL_ERRORS = ()
+
+logger = logging.getLogger("GameLauncher.terminator")
+
+IS_WINDOWS = sys.platform == "win32"
+HAS_PIDFD = hasattr(os, "pidfd_open") and hasattr(signal, "pidfd_send_signal")
+
+terminate_seconds = metrics.histogram(
+    "launcher_terminate_duration_seconds",
+    "Time from the termination request until a game's main process was gone",
+    ("game_code", "outcome"))
+terminate_all_seconds = metrics.histogram(
+    "launcher_terminate_all_duration_seconds",
+    "Wall time of a whole termination pass over every running game")
+
+
+def descendants(pid):
+    """PIDs of every process below ``pid``, deepest last"""
+    if psutil is not None:
+        try:
+            return [child.pid for child in psutil.Process(pid).children(recursive=True)]
+        except psutil.Error:
+            return []
+    if not os.path.isdir("/proc"):
+        return []
+    children = collections.defaultdict(list)
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "rb") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # The command name may contain spaces, so split after its closing paren
+        ppid = int(stat[stat.rindex(b")") + 2:].split()[1])
+        children[ppid].append(int(entry))
+    found = []
+    stack = [pid]
+    while stack:
+        for child in children.get(stack.pop(), ()):
+            found.append(child)
+            stack.append(child)
+    return found
+
+
+def pid_alive(pid):
+    """Whether ``pid`` is still running; zombies count as gone"""
+    if psutil is not None:
+        try:
+            return psutil.Process(pid).status() != psutil.STATUS_ZOMBIE
+        except psutil.Error:
+            return False
+    if IS_WINDOWS:
+        # Without psutil there is no cheap liveness check; taskkill /T covers the tree
+        return False
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            stat = f.read()
+        return stat[stat.rindex(b")") + 2:][:1] != b"Z"
+    except FileNotFoundError:
+        return False
+    except OSError:
+        pass
+    try:
+        os.kill(pid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+
+class _Target:
+    """One process being terminated, either a supervised game or one of its descendants"""
+
+    def __init__(self, pid, game, root):
+        self.pid = pid
+        self.game = game
+        self.root = root
+        self.pidfd = None
+        self.finished_at = None
+        self.escalated = False
+        if HAS_PIDFD:
+            # Opened before signalling so a recycled PID can never be hit
+            try:
+                self.pidfd = os.pidfd_open(pid)
+            except OSError:
+                # A game whose launcher already exited is done once the supervisor says so
+                if not root:
+                    self.finished_at = time.monotonic()
+
+    @property
+    def done(self):
+        return self.finished_at is not None
+
+    def signal(self, hard):
+        try:
+            if self.root:
+                if hard:
+                    self.game.process.kill()
+                else:
+                    self.game.process.terminate()
+            elif self.pidfd is not None:
+                signal.pidfd_send_signal(self.pidfd, signal.SIGKILL if hard else signal.SIGTERM)
+            elif psutil is not None:
+                process = psutil.Process(self.pid)
+                process.kill() if hard else process.terminate()
+            elif not IS_WINDOWS:
+                os.kill(self.pid, signal.SIGKILL if hard else signal.SIGTERM)
+        except (OSError, *PSUTIL_ERRORS) as e:
+            logger.debug("Signal to %s failed: %s", self.pid, e)
+
+    def check(self):
+        if self.done:
+            return True
+        if self.root:
+            finished = self.game.exited.is_set()
+        elif self.pidfd is not None:
+            finished = bool(select.select([self.pidfd], [], [], 0)[0])
+        else:
+            finished = not pid_alive(self.pid)
+        if finished:
+            self.finished_at = time.monotonic()
+        return finished
+
+    def close(self):
+        if self.pidfd is not None:
+            os.close(self.pidfd)
+            self.pidfd = None
+
+
+def _tree(game):
+    """PIDs of every process of ``game`` but its first: its descendants plus the rest of its process group or job"""
+    pids = descendants(game.pid)
+    if game.tree is not None:
+        pids.extend(pid for pid in game.tree.members() if pid != game.pid and pid not in pids)
+    return pids
+
+
+class TerminationEngine:
+    """Terminates every supervised game and its process tree against one shared deadline
+
+    All trees are sent a polite termination request at once. Whatever is still
+    alive when ``grace`` seconds have passed is killed, and the call returns
+    once every process is gone or ``kill_timeout`` more seconds have passed.
+    """
+
+    def __init__(self, supervisor, grace=3.0, kill_timeout=2.0, interval=0.02):
+        self.supervisor = supervisor
+        self.grace = grace
+        self.kill_timeout = kill_timeout
+        self.interval = interval
+
+    def terminate(self, games=None):
+        """Terminate ``games`` (default: all running) and return per-process timings"""
+        if games is None:
+            games = self.supervisor.running()
+        started = time.monotonic()
+
+        targets = []
+        for game in games:
+            game.terminating = True
+            targets.append(_Target(game.pid, game, root=True))
+            targets.extend(_Target(pid, game, root=False) for pid in _tree(game))
+
+        for target in targets:
+            target.signal(hard=False)
+        self._wait(targets, started + self.grace)
+
+        stragglers = [target for target in targets if not target.done]
+        if stragglers:
+            # Pick up anything a surviving game spawned while it was being asked to quit
+            known = {target.pid for target in targets}
+            for game in {target.game for target in stragglers if target.root}:
+                late = [_Target(pid, game, root=False) for pid in _tree(game) if pid not in known]
+                targets.extend(late)
+                stragglers.extend(late)
+            logger.warning("Escalating to kill for %s process(es) still running", len(stragglers))
+            for target in stragglers:
+                target.escalated = True
+                target.signal(hard=True)
+            for game in {target.game for target in stragglers}:
+                if game.tree is not None:
+                    game.tree.signal(hard=True)
+            if IS_WINDOWS and psutil is None:
+                for game in {target.game for target in stragglers}:
+                    subprocess.run(["taskkill", "/T", "/F", "/PID", str(game.pid)],
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            self._wait(stragglers, time.monotonic() + self.kill_timeout)
+
+        processes = []
+        for target in targets:
+            target.close()
+            if target.done:
+                outcome = "killed" if target.escalated else "exited"
+                elapsed = round((target.finished_at - started) * 1000, 1)
+            else:
+                outcome = "survived"
+                elapsed = None
+                logger.error("Process %s (%s) survived termination", target.pid, target.game.name)
+            processes.append({
+                "pid": target.pid,
+                "name": target.game.name,
+                "game_code": target.game.game_code,
+                "root": target.root,
+                "outcome": outcome,
+                "elapsed_ms": elapsed,
+            })
+            if target.root:
+                terminate_seconds.labels(target.game.game_code, outcome).observe(
+                    (target.finished_at if target.done else time.monotonic()) - started)
+
+        terminate_all_seconds.observe(time.monotonic() - started)
+
+        return {
+            "elapsed_ms": round((time.monotonic() - started) * 1000, 1),
+            "station_free": all(process["outcome"] != "survived" for process in processes),
+            "processes": processes,
+        }
+
+    def _wait(self, targets, deadline):
+        pending = [target for target in targets if not target.check()]
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            timeout = min(remaining, self.interval)
+            pidfds = [target.pidfd for target in pending if target.pidfd is not None]
+            if pidfds:
+                select.select(pidfds, [], [], timeout)
+            else:
+                time.sleep(timeout)
+            pending = [target for target in pending if not target.check()]
@@ -0,0 +1,170 @@
+import collections
+import contextvars
+import functools
+import itertools
+import os
+import re
+import threading
+import time
+import uuid
+
+# Carries a trace id in from the caller (the Electron main process, the fleet
+# controller) and back out on the response
+TRACE_HEADER = "X-Trace-Id"
+
+_VALID_TRACE_ID = re.compile(r"^[A-Za-z0-9_.-]{1,64}$")
+
+
+class Span:
+    """One timed operation; a child of whatever span was current when it started"""
+
+    __slots__ = ("tracer", "name", "args", "trace_id", "span_id", "parent_id", "started", "_token")
+
+    def __init__(self, tracer, name, args, trace_id=None, parent=None):
+        if parent is None and trace_id is None:
+            parent = tracer._current.get()
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.span_id = next(tracer._ids)
+        self.trace_id = trace_id or (parent.trace_id if parent is not None else uuid.uuid4().hex[:16])
+        self.parent_id = parent.span_id if parent is not None else None
+        self.started = None
+        self._token = None
+
+    def start(self):
+        self._token = self.tracer._current.set(self)
+        self.started = time.perf_counter_ns()
+        return self
+
+    def finish(self, **args):
+        ended = time.perf_counter_ns()
+        if args:
+            self.args.update(args)
+        self.tracer._current.reset(self._token)
+        self.tracer._record(self, ended)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.finish(error=repr(exc))
+        else:
+            self.finish()
+
+
+class _NoopSpan:
+    trace_id = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """Records finished spans in a ring buffer and exports them as Chrome trace events
+
+    While disabled, ``span()`` returns a shared no-op and ``traced`` functions
+    call straight through, so tracing costs one attribute check. Load the
+    ``/trace`` export in chrome://tracing or https://ui.perfetto.dev.
+    """
+
+    def __init__(self, capacity=10000, enabled=False):
+        self.enabled = enabled
+        self._events = collections.deque(maxlen=capacity)
+        self._threads = {}
+        self._current = contextvars.ContextVar("launcher_span", default=None)
+        self._ids = itertools.count(1)
+
+    def span(self, name, trace_id=None, parent=None, **args):
+        """Context manager timing ``name``; ``parent`` continues a span from another thread"""
+        if not self.enabled:
+            return _NOOP_SPAN
+        return Span(self, name, args, trace_id, parent)
+
+    def begin(self, name, trace_id=None, **args):
+        """Start a span that is ended later with ``finish()``, e.g. across request hooks"""
+        if trace_id is not None and not _VALID_TRACE_ID.match(trace_id):
+            trace_id = None
+        return Span(self, name, args, trace_id).start()
+
+    def traced(self, name=None):
+        """Decorator recording a span around every call of the function"""
+        def decorate(func):
+            span_name = name or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with Span(self, span_name, {}):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def current(self):
+        return self._current.get() if self.enabled else None
+
+    def annotate(self, **args):
+        """Attach ``args`` to the current span"""
+        if self.enabled:
+            span = self._current.get()
+            if span is not None:
+                span.args.update(args)
+
+    def _record(self, span, ended):
+        thread = threading.current_thread()
+        self._threads[thread.ident] = thread.name
+        self._events.append((span.name, span.trace_id, span.span_id, span.parent_id,
+                             thread.ident, span.started // 1000, (ended - span.started) // 1000, span.args))
+
+    def export(self, trace_id=None):
+        """The buffered spans, optionally of one trace, in Chrome trace-event JSON format"""
+        pid = os.getpid()
+        events = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": thread_name}}
+            for tid, thread_name in list(self._threads.items())
+        ]
+        for name, span_trace_id, span_id, parent_id, tid, ts, dur, args in list(self._events):
+            if trace_id is not None and span_trace_id != trace_id:
+                continue
+            events.append({
+                "name": name, "cat": "launcher", "ph": "X", "ts": ts, "dur": dur, "pid": pid, "tid": tid,
+                "args": dict(args, trace_id=span_trace_id, span_id=span_id, parent_id=parent_id),
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def clear(self):
+        self._events.clear()
+
+
+tracer = Tracer(capacity=int(os.environ.get("LAUNCHER_TRACE_BUFFER", 10000)),
+                enabled=os.environ.get("LAUNCHER_TRACE") == "1")
+span = tracer.span
+traced = tracer.traced
+annotate = tracer.annotate
+
+
+def track_requests(app, tracer=tracer):
+    """Open a root span per request, continuing the caller's X-Trace-Id if it sent one"""
+    from flask import g, request
+
+    @app.before_request
+    def start_trace():
+        if tracer.enabled:
+            g.trace_span = tracer.begin(f"{request.method} {request.path}",
+                                        trace_id=request.headers.get(TRACE_HEADER))
+
+    @app.after_request
+    def finish_trace(response):
+        trace_span = g.pop("trace_span", None)
+        if trace_span is not None:
+            trace_span.finish(status=response.status_code)
+            response.headers[TRACE_HEADER] = trace_span.trace_id
+        return response
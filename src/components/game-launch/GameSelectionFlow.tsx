@@ -3,6 +3,7 @@ import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { Button } from '@/components/ui/button';
 import { useToast } from '@/hooks/use-toast';
+import { useLauncherEvents } from '@/hooks/useLauncherEvents';
 import { Play, X, Gamepad } from 'lucide-react';
 import { Card, CardContent, CardHeader, CardTitle, CardDescription, CardFooter } from '@/components/ui/card';
 import { Separator } from '@/components/ui/separator';
@@ -84,10 +85,18 @@ export const GameSelectionFlow: React.FC = () => {
   const [timerDuration, setTimerDuration] = useState(300); // Default 5 minutes
   const [loading, setLoading] = useState(false);
   const [rfidInput, setRfidInput] = useState('');
-  const [serverStatus, setServerStatus] = useState<'connected' | 'disconnected' | 'checking'>('checking');
   const [showRating, setShowRating] = useState(false);
   
   const { toast } = useToast();
+  const { serverStatus, reconnect } = useLauncherEvents(event => {
+    if (event.type === 'exited') {
+      toast({
+        title: "Game Closed",
+        description: `${event.name} exited on its own (code ${event.exit_code}).`,
+        variant: "destructive",
+      });
+    }
+  });
   const navigate = useNavigate();
 
   useEffect(() => {
@@ -115,34 +124,8 @@ export const GameSelectionFlow: React.FC = () => {
     };
     
     fetchTimerSettings();
-    checkServerConnection();
-    
-    const intervalId = setInterval(checkServerConnection, 10000);
-    
-    return () => clearInterval(intervalId);
   }, []);
 
-  const checkServerConnection = async () => {
-    setServerStatus('checking');
-    try {
-      const res = await fetch(`${API_URL}/keypress`, {
-        method: 'HEAD',
-        signal: AbortSignal.timeout(2000)
-      });
-      
-      if (res.ok || res.status === 404) {
-        setServerStatus('connected');
-        console.log("Server health check successful");
-      } else {
-        setServerStatus('disconnected');
-        console.error("Server returned error:", res.status, res.statusText);
-      }
-    } catch (error) {
-      setServerStatus('disconnected');
-      console.error('Error checking server connection:', error);
-    }
-  };
-
   useEffect(() => {
     const handleKeyPress = (event: KeyboardEvent) => {
       if (showRFIDScreen && /^\d$/.test(event.key)) {
@@ -402,7 +385,7 @@ export const GameSelectionFlow: React.FC = () => {
               <Button 
                 variant="outline" 
                 size="sm" 
-                onClick={checkServerConnection}
+                onClick={reconnect}
                 className="ml-auto border-red-700 bg-red-900/50 text-red-300 hover:bg-red-800"
               >
                 Retry
@@ -500,7 +483,7 @@ export const GameSelectionFlow: React.FC = () => {
               <Button 
                 variant="outline" 
                 size="sm" 
-                onClick={checkServerConnection}
+                onClick={reconnect}
                 className="ml-auto border-red-700 bg-red-900/50 text-red-300 hover:bg-red-800"
               >
                 Retry
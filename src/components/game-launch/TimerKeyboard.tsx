@@ -2,6 +2,7 @@ import React, { useEffect, useState } from 'react';
 import { useToast } from '@/hooks/use-toast';
 import { Alert, AlertTitle, AlertDescription } from '../ui/alert';
 import { Button } from '../ui/button';
+import { useLauncherEvents } from '@/hooks/useLauncherEvents';
 import { supabase } from '@/integrations/supabase/client';
 import { motion } from 'framer-motion';
 import { useNavigate } from 'react-router-dom';
@@ -19,33 +20,16 @@ export function TimerKeyboard({ onKeyPress }: TimerKeyboardProps) {
   const [reconnectAttempts, setReconnectAttempts] = useState(0);
   const [sessionCreated, setSessionCreated] = useState(false);
 
-  useEffect(() => {
-    checkServerConnectivity();
-    
-    const intervalId = setInterval(checkServerConnectivity, 10000);
-    
-    return () => {
-      clearInterval(intervalId);
-    };
-  }, []);
+  const { serverStatus, reconnect } = useLauncherEvents();
 
-  const checkServerConnectivity = () => {
-    fetch('http://localhost:5002/keypress', {
-      method: 'HEAD',
-      signal: AbortSignal.timeout(2000),
-    })
-      .then(response => {
-        if (response.ok || response.status === 404) {
-          setConnectionError(false);
-          setReconnectAttempts(0);
-        } else {
-          throw new Error(`Server returned: ${response.status}`);
-        }
-      })
-      .catch(() => {
-        setConnectionError(true);
-      });
-  };
+  useEffect(() => {
+    if (serverStatus === 'connected') {
+      setConnectionError(false);
+      setReconnectAttempts(0);
+    } else if (serverStatus === 'disconnected') {
+      setConnectionError(true);
+    }
+  }, [serverStatus]);
 
   const createGameSession = async (gameKey: string) => {
     if (sessionCreated) return;
@@ -310,7 +294,7 @@ export function TimerKeyboard({ onKeyPress }: TimerKeyboardProps) {
               Unable to connect to the Python server. {reconnectAttempts > 0 && `Attempted ${reconnectAttempts} reconnects.`}
               <button 
                 className="ml-2 text-white underline" 
-                onClick={() => checkServerConnectivity()}
+                onClick={reconnect}
               >
                 Retry Connection
               </button>
@@ -3,6 +3,7 @@ import React, { useEffect, useState } from 'react';
 import { useToast } from '../ui/use-toast';
 import { Alert, AlertTitle, AlertDescription } from '../ui/alert';
 import { Button } from '../ui/button';
+import { useLauncherEvents } from '@/hooks/useLauncherEvents';
 
 interface VirtualKeyboardProps {
   onKeyPress: (key: string) => void;
@@ -25,37 +26,16 @@ export function VirtualKeyboard({
   const [lastStatus, setLastStatus] = useState<number | null>(null);
   const [reconnectAttempts, setReconnectAttempts] = useState(0);
 
-  useEffect(() => {
-    checkServerConnectivity();
-    
-    const intervalId = setInterval(checkServerConnectivity, 10000);
-    
-    return () => {
-      clearInterval(intervalId);
-    };
-  }, []);
+  const { serverStatus, reconnect } = useLauncherEvents();
 
-  const checkServerConnectivity = () => {
-    fetch('http://localhost:5002/close', {
-      method: 'POST',
-      signal: AbortSignal.timeout(2000),
-      headers: { 
-        'Accept-Charset': 'UTF-8',
-        'Content-Type': 'application/json'
-      }
-    })
-      .then(response => {
-        if (response.ok || response.status === 204 || response.status === 404) {
-          setConnectionError(false);
-          setReconnectAttempts(0);
-        } else {
-          throw new Error(`Server returned: ${response.status}`);
-        }
-      })
-      .catch(() => {
-        setConnectionError(true);
-      });
-  };
+  useEffect(() => {
+    if (serverStatus === 'connected') {
+      setConnectionError(false);
+      setReconnectAttempts(0);
+    } else if (serverStatus === 'disconnected') {
+      setConnectionError(true);
+    }
+  }, [serverStatus]);
 
   const handleKeyClick = (key: string) => {
     console.log(`Virtual Keyboard - Sending key: ${key}`);
@@ -194,7 +174,7 @@ export function VirtualKeyboard({
             Unable to connect to the Python server. {reconnectAttempts > 0 && `Attempted ${reconnectAttempts} reconnects.`}
             <button 
               className="ml-2 text-white underline" 
-              onClick={() => checkServerConnectivity()}
+              onClick={reconnect}
             >
               Retry Connection
             </button>
@@ -0,0 +1,120 @@
+import { createContext, useContext, useState, useEffect, useRef, useCallback, type ReactNode } from 'react';
+
+const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:5002';
+
+// The server sends a heartbeat every 5 seconds; missing two means it is gone
+const HEARTBEAT_TIMEOUT = 12000;
+
+export type LauncherEventType =
+  | 'heartbeat' | 'launched' | 'adopted' | 'exited' | 'terminated' | 'watchdog'
+  | 'session_started' | 'session_extended' | 'session_paused' | 'session_resumed' | 'session_ended';
+
+export interface LauncherEvent {
+  type: LauncherEventType;
+  game_code?: string;
+  name?: string;
+  pid?: number;
+  exit_code?: number | null;
+  runtime?: number | null;
+  state?: string;
+  reason?: 'hung' | 'memory' | 'expired' | 'exited' | 'stopped' | null;
+  session_id?: string;
+  paid?: number;
+  played?: number;
+  remaining?: number;
+}
+
+export type ServerStatus = 'connected' | 'disconnected' | 'checking';
+
+type Listener = (event: LauncherEvent) => void;
+
+interface LauncherEventsContextValue {
+  serverStatus: ServerStatus;
+  reconnect: () => void;
+  subscribe: (listener: Listener) => () => void;
+}
+
+const LauncherEventsContext = createContext<LauncherEventsContextValue | null>(null);
+
+// One /events stream for the whole app: every stream holds a browser connection,
+// a server worker and one of the server's few subscriber slots
+export function LauncherEventsProvider({ children }: { children: ReactNode }) {
+  const [serverStatus, setServerStatus] = useState<ServerStatus>('checking');
+  const [connection, setConnection] = useState(0);
+  const listenersRef = useRef(new Set<Listener>());
+
+  useEffect(() => {
+    const source = new EventSource(`${API_URL}/events`);
+    let timeoutId: ReturnType<typeof setTimeout>;
+
+    const resetWatchdog = () => {
+      clearTimeout(timeoutId);
+      timeoutId = setTimeout(() => setServerStatus('disconnected'), HEARTBEAT_TIMEOUT);
+    };
+
+    const handleEvent = (message: MessageEvent) => {
+      setServerStatus('connected');
+      resetWatchdog();
+      let event: LauncherEvent;
+      try {
+        event = { type: message.type as LauncherEventType, ...JSON.parse(message.data) };
+      } catch (error) {
+        console.error('Invalid launcher event:', error);
+        return;
+      }
+      listenersRef.current.forEach(listener => {
+        try {
+          listener(event);
+        } catch (error) {
+          console.error('Error in launcher event listener:', error);
+        }
+      });
+    };
+
+    const eventTypes: LauncherEventType[] = [
+      'heartbeat', 'launched', 'adopted', 'exited', 'terminated', 'watchdog',
+      'session_started', 'session_extended', 'session_paused', 'session_resumed', 'session_ended',
+    ];
+    eventTypes.forEach(type => source.addEventListener(type, handleEvent));
+    // EventSource reconnects on its own; just reflect the outage meanwhile
+    source.onerror = () => setServerStatus('disconnected');
+    resetWatchdog();
+
+    return () => {
+      clearTimeout(timeoutId);
+      source.close();
+    };
+  }, [connection]);
+
+  const reconnect = useCallback(() => {
+    setServerStatus('checking');
+    setConnection(prev => prev + 1);
+  }, []);
+
+  const subscribe = useCallback((listener: Listener) => {
+    listenersRef.current.add(listener);
+    return () => {
+      listenersRef.current.delete(listener);
+    };
+  }, []);
+
+  return (
+    <LauncherEventsContext.Provider value={{ serverStatus, reconnect, subscribe }}>
+      {children}
+    </LauncherEventsContext.Provider>
+  );
+}
+
+export function useLauncherEvents(onEvent?: Listener) {
+  const context = useContext(LauncherEventsContext);
+  if (!context) {
+    throw new Error('useLauncherEvents must be used within a LauncherEventsProvider.');
+  }
+  const { serverStatus, reconnect, subscribe } = context;
+  const onEventRef = useRef(onEvent);
+  onEventRef.current = onEvent;
+
+  useEffect(() => subscribe(event => onEventRef.current?.(event)), [subscribe]);
+
+  return { serverStatus, reconnect };
+}
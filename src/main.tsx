@@ -2,10 +2,13 @@
 import { createRoot } from 'react-dom/client';
 import { BrowserRouter } from 'react-router-dom';
 import App from './App.tsx';
+import { LauncherEventsProvider } from './hooks/useLauncherEvents';
 import './index.css';
 
 createRoot(document.getElementById('root')!).render(
   <BrowserRouter>
-    <App />
+    <LauncherEventsProvider>
+      <App />
+    </LauncherEventsProvider>
   </BrowserRouter>
 );
@@ -3,6 +3,7 @@ import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { Button } from '@/components/ui/button';
 import { useToast } from '@/hooks/use-toast';
+import { useLauncherEvents } from '@/hooks/useLauncherEvents';
 import { Keyboard, Timer, Play, X, Activity, Settings, Eye, EyeOff, Server } from 'lucide-react';
 import { Card, CardContent, CardHeader, CardTitle, CardDescription, CardFooter } from '@/components/ui/card';
 import { Separator } from '@/components/ui/separator';
@@ -82,12 +83,33 @@ const GAME_KEYS = {
 const CppLauncher: React.FC = () => {
   const [response, setResponse] = useState<string | null>(null);
   const [loading, setLoading] = useState(false);
-  const [serverStatus, setServerStatus] = useState<'connected' | 'disconnected' | 'checking'>('checking');
   const [activeGame, setActiveGame] = useState<string | null>(null);
   const [showTimer, setShowTimer] = useState(false);
   const [showRating, setShowRating] = useState(false);
   const [timerDuration, setTimerDuration] = useState(300); // Default 5 minutes, will be overridden by settings
   const { toast } = useToast();
+  const { serverStatus, reconnect } = useLauncherEvents(event => {
+    if (event.type === 'exited') {
+      toast({
+        title: "Game Closed",
+        description: `${event.name} exited on its own (code ${event.exit_code}).`,
+        variant: "destructive",
+      });
+    } else if (event.type === 'watchdog') {
+      toast({
+        title: "Game Stopped",
+        description: event.reason === 'memory'
+          ? `${event.name} was stopped for using too much memory.`
+          : `${event.name} stopped responding and was closed.`,
+        variant: "destructive",
+      });
+    } else if (event.type === 'session_ended' && event.reason === 'expired') {
+      toast({
+        title: "Time's Up",
+        description: `${event.name} was closed at the end of the session.`,
+      });
+    }
+  });
   const navigate = useNavigate();
 
   const createGameSession = async (gameName: string) => {
@@ -162,34 +184,8 @@ const CppLauncher: React.FC = () => {
     };
     
     fetchTimerSettings();
-    checkServerConnection();
-    
-    const intervalId = setInterval(checkServerConnection, 10000);
-    
-    return () => clearInterval(intervalId);
   }, []);
 
-  const checkServerConnection = async () => {
-    setServerStatus('checking');
-    try {
-      const res = await fetch(`${API_URL}/keypress`, {
-        method: 'HEAD',
-        signal: AbortSignal.timeout(2000)
-      });
-      
-      if (res.ok || res.status === 404) {
-        setServerStatus('connected');
-        console.log("Server health check successful");
-      } else {
-        setServerStatus('disconnected');
-        console.error("Server returned error:", res.status, res.statusText);
-      }
-    } catch (error) {
-      setServerStatus('disconnected');
-      console.error('Error checking server connection:', error);
-    }
-  };
-
   const handleTestConnection = async () => {
     setLoading(true);
     try {
@@ -236,7 +232,8 @@ const CppLauncher: React.FC = () => {
         headers: {
           'Content-Type': 'application/json',
         },
-        body: JSON.stringify({ key }),
+        // The server stops the game itself once the session runs out
+        body: JSON.stringify({ key, duration: timerDuration }),
       });
       
       if (res.ok) {
@@ -437,7 +434,7 @@ const CppLauncher: React.FC = () => {
               <Button 
                 variant="outline" 
                 size="sm" 
-                onClick={checkServerConnection}
+                onClick={reconnect}
                 className="ml-auto border-red-700 bg-red-900/50 text-red-300 hover:bg-red-800 text-base"
               >
                 Retry
@@ -0,0 +1,18 @@
+"""One station's launcher server for the fleet tests, with key injection switched off
+
+    python tests/agent.py PORT
+"""
+import sys
+
+from stubs import ROOT
+
+sys.path.insert(0, ROOT)
+
+# Injected keys would land on the desktop running the tests
+import keyboard  # noqa: E402
+keyboard.press_and_release = lambda *args, **kwargs: None
+
+from launcher.server import main  # noqa: E402
+
+if __name__ == "__main__":
+    main(["--profile", "app", "--host", "127.0.0.1", "--port", sys.argv[1]])
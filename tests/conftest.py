@@ -0,0 +1,37 @@
+import os
+import signal
+import sys
+
+import pytest
+
+from stubs import ROOT, Listener, write_stub
+
+sys.path.insert(0, ROOT)
+
+# Stub games are shell scripts and process states are read from /proc
+if not sys.platform.startswith("linux"):
+    collect_ignore_glob = ["test_*.py"]
+
+
+@pytest.fixture
+def stub(tmp_path):
+    """``stub(name, body)`` writes a stub game; every process group a stub started is killed afterwards"""
+    yield lambda name, body: write_stub(str(tmp_path), name, body)
+    try:
+        with open(tmp_path / "pids") as f:
+            pids = [int(line) for line in f if line.strip()]
+    except OSError:
+        return
+    for pid in pids:
+        for kill in (os.killpg, os.kill):
+            try:
+                kill(pid, signal.SIGKILL)
+            except OSError:
+                pass
+
+
+@pytest.fixture
+def listener():
+    server = Listener()
+    yield server
+    server.close()
@@ -0,0 +1,111 @@
+"""Real stand-ins for what the launcher talks to: shell stub games and an Electron listener"""
+import http.server
+import os
+import socket
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def write_stub(directory, name, body):
+    """An executable shell script at ``directory/name.sh``; it records its PID in ``directory/pids``"""
+    path = os.path.join(directory, f"{name}.sh")
+    with open(path, "w") as f:
+        f.write(f'#!/bin/sh\necho $$ >> "{os.path.join(directory, "pids")}"\n{body}\n')
+    os.chmod(path, 0o755)
+    return path
+
+
+def state(pid):
+    """The /proc state letter of ``pid`` (R, S, T, Z, ...), or None once it is gone"""
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            stat = f.read()
+    except OSError:
+        return None
+    return stat[stat.rindex(b")") + 2:].split()[0].decode()
+
+
+def alive(pid):
+    return state(pid) not in (None, "Z")
+
+
+def children(pid):
+    """PIDs of the living direct children of ``pid``"""
+    found = []
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat", "rb") as f:
+                    stat = f.read()
+            except OSError:
+                continue
+            fields = stat[stat.rindex(b")") + 2:].split()
+            if int(fields[1]) == pid and fields[0] != b"Z":
+                found.append(int(entry))
+    return found
+
+
+def wait_until(predicate, timeout=5.0, interval=0.02):
+    """Poll ``predicate`` until it is true; returns its last value"""
+    deadline = time.monotonic() + timeout
+    while True:
+        value = predicate()
+        if value or time.monotonic() >= deadline:
+            return value
+        time.sleep(interval)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class Listener(http.server.ThreadingHTTPServer):
+    """Stands in for the Electron main process' command listeners on an ephemeral port
+
+    Every POST is recorded as (path, body, headers). While ``gate`` is clear,
+    requests are recorded on arrival but not answered.
+    """
+
+    daemon_threads = True
+
+    def __init__(self):
+        self.received = []
+        self.cond = threading.Condition()
+        self.gate = threading.Event()
+        self.gate.set()
+        super().__init__(("127.0.0.1", 0), _ListenerHandler)
+        self.url = f"http://127.0.0.1:{self.server_address[1]}"
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def wait_for(self, count, timeout=5.0):
+        """The requests received once there are at least ``count`` of them, or after ``timeout``"""
+        with self.cond:
+            self.cond.wait_for(lambda: len(self.received) >= count, timeout)
+            return list(self.received)
+
+    def close(self):
+        self.gate.set()
+        self.shutdown()
+        self.server_close()
+
+
+class _ListenerHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0)).decode()
+        with self.server.cond:
+            self.server.received.append((self.path, body, dict(self.headers)))
+            self.server.cond.notify_all()
+        self.server.gate.wait(10)
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, format, *args):
+        pass
@@ -0,0 +1,31 @@
+import pytest
+
+from launcher import batch
+
+
+def keypress(step):
+    return {"status": "success", "key": step["key"]}, 200
+
+
+def test_a_step_type_that_is_not_a_string_fails_only_that_step():
+    steps, stop_on_error = batch.parse({"steps": [{"type": ["keypress"], "key": "a"}, {"key": "b"}]})
+
+    result = batch.run_batch(steps, {"keypress": keypress}, stop_on_error)
+
+    first, second = result["steps"]
+    assert (first["ok"], first["status_code"]) == (False, 400)
+    assert first["result"] == {"error": "Step type must be a string"}
+    assert second["ok"] and second["result"]["key"] == "b"
+    assert result["status"] == "error"
+
+
+@pytest.mark.parametrize("data", [
+    {"steps": []},
+    {"steps": [{"key": "a", "delay_ms": 5001}]},
+    {"steps": [{"key": "a", "delay_ms": 5000}] * 3},
+    {"steps": [{}]},
+    [{"key": "a"}],
+])
+def test_malformed_batches_are_rejected(data):
+    with pytest.raises(ValueError):
+        batch.parse(data)
@@ -0,0 +1,118 @@
+import json
+import os
+import signal
+import subprocess
+import sys
+
+import pytest
+import requests
+
+import fleet
+from stubs import alive, free_port, wait_until
+
+AGENTS = ("pod-1", "pod-2", "pod-3")
+
+
+@pytest.fixture
+def agents(stub, tmp_path):
+    """Launcher servers for three stations, each with its own stub game registry and working directory"""
+    games = tmp_path / "games.json"
+    games.write_text(json.dumps({"games": [
+        {"code": "BTS", "name": "Stub BTS", "hotkey": "b", "path": stub("bts", "exec sleep 300")}]}))
+    servers = {}
+    for name in AGENTS:
+        workdir = tmp_path / name
+        workdir.mkdir()
+        port = free_port()
+        env = dict(os.environ, LAUNCHER_GAMES_FILE=str(games), LAUNCHER_ADMISSION="0",
+                   LAUNCHER_LOG_LEVEL="WARNING")
+        process = subprocess.Popen(
+            [sys.executable, os.path.join(os.path.dirname(__file__), "agent.py"), str(port)],
+            cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        servers[name] = (process, f"http://127.0.0.1:{port}")
+    try:
+        for process, url in servers.values():
+            assert wait_until(lambda: _healthy(url), timeout=30), f"{url} did not start"
+        yield {name: url for name, (_, url) in servers.items()}
+    finally:
+        for process, _ in servers.values():
+            process.send_signal(signal.SIGTERM)
+        for process, _ in servers.values():
+            try:
+                process.wait(15)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+
+
+def _healthy(url):
+    try:
+        return requests.get(url + "/health", timeout=1).ok
+    except requests.RequestException:
+        return False
+
+
+@pytest.fixture
+def controller(agents):
+    controller = fleet.FleetController([fleet.Station(name, url) for name, url in agents.items()], timeout=10)
+    yield controller
+    controller.close()
+
+
+def test_launch_and_stop_on_every_station(controller, agents):
+    result = controller.launch("BTS")
+
+    assert result["ok"] == list(AGENTS)
+    assert result["failed"] == []
+    pids = {}
+    for name, url in agents.items():
+        (game,) = requests.get(url + "/status", timeout=5).json()["running"]
+        assert game["game_code"] == "BTS"
+        pids[name] = game["pid"]
+    assert len(set(pids.values())) == len(AGENTS)
+
+    result = controller.stop()
+
+    assert result["ok"] == list(AGENTS)
+    for name, station in result["stations"].items():
+        assert station["result"]["station_free"]
+        assert not alive(pids[name])
+
+
+def test_watch_follows_the_event_stream_of_every_station(controller):
+    controller.watch()
+    assert wait_until(lambda: all(h["connected"] for h in controller.health().values()), timeout=10)
+
+    controller.launch("BTS", names=["pod-2"])
+
+    assert wait_until(lambda: controller.health()["pod-2"]["running"] == ["BTS"], timeout=10)
+    health = controller.health()
+    assert all(health[name]["healthy"] for name in AGENTS)
+    assert health["pod-1"]["running"] == health["pod-3"]["running"] == []
+
+    controller.stop(names=["pod-2"])
+
+    assert wait_until(lambda: controller.health()["pod-2"]["running"] == [], timeout=10)
+
+
+def test_a_station_that_is_down_is_reported_without_holding_up_the_rest(agents):
+    stations = [fleet.Station(name, url) for name, url in agents.items()]
+    stations.append(fleet.Station("pod-down", f"http://127.0.0.1:{free_port()}"))
+    controller = fleet.FleetController(stations, timeout=10)
+    try:
+        result = controller.status()
+    finally:
+        controller.close()
+
+    assert result["ok"] == list(AGENTS)
+    assert result["failed"] == ["pod-down"]
+    assert "error" in result["stations"]["pod-down"]
+
+
+def test_unknown_game_and_station(controller):
+    result = controller.launch("NOPE")
+    assert result["failed"] == list(AGENTS)
+    assert all("Unknown game code" in station["error"] for station in result["stations"].values())
+
+    with pytest.raises(KeyError):
+        controller.stop(names=["pod-9"])
@@ -0,0 +1,19 @@
+import logging
+import threading
+
+from launcher.logging_setup import BackgroundQueueHandler, setup_logging
+
+
+def test_setting_up_again_replaces_the_previous_writer(tmp_path):
+    setup_logging(str(tmp_path / "first.log"))
+    writers = threading.active_count()
+    setup_logging(str(tmp_path / "second.log"))
+
+    logging.getLogger("GameLauncher.test").warning("logged once")
+    setup_logging(str(tmp_path / "third.log"))
+
+    root = logging.getLogger()
+    assert sum(isinstance(handler, BackgroundQueueHandler) for handler in root.handlers) == 1
+    assert threading.active_count() == writers
+    assert (tmp_path / "second.log").read_text(encoding="utf-8").count("logged once") == 1
+    assert "logged once" not in (tmp_path / "first.log").read_text(encoding="utf-8")
@@ -0,0 +1,76 @@
+from launcher import tracing
+from launcher.notifier import ElectronNotifier, NotifierTarget
+from stubs import free_port, wait_until
+
+
+def test_commands_reach_listeners_that_accept_them(listener):
+    notifier = ElectronNotifier([
+        NotifierTarget("electron", listener.url + "/"),
+        NotifierTarget("electron-stop", listener.url + "/stop", send_body=False, commands={"STOP_GAME"}),
+    ])
+    try:
+        notifier.notify("KEY_S_PRESSED")
+        notifier.notify("STOP_GAME")
+        received = listener.wait_for(3)
+    finally:
+        notifier.close()
+
+    assert sorted((path, body) for path, body, _ in received) == [
+        ("/", "KEY_S_PRESSED"), ("/", "STOP_GAME"), ("/stop", "")]
+    stats = notifier.stats()
+    assert stats["electron"]["sent"] == 2
+    assert stats["electron-stop"]["sent"] == 1
+    assert stats["electron"]["failed"] == 0
+
+
+def test_stop_game_is_coalesced_while_the_listener_is_busy(listener):
+    target = NotifierTarget("electron", listener.url)
+    target.start()
+    try:
+        listener.gate.clear()
+        target.put("KEY_S_PRESSED")
+        listener.wait_for(1)
+        # The worker is stuck on the first request, so these pile up behind it
+        for _ in range(3):
+            assert target.put("STOP_GAME")
+        listener.gate.set()
+        received = listener.wait_for(2)
+        assert wait_until(lambda: target.sent == 2)
+    finally:
+        target.stop()
+        target.join(5)
+
+    assert [body for _, body, _ in received] == ["KEY_S_PRESSED", "STOP_GAME"]
+    assert target.coalesced == 2
+
+
+def test_failed_delivery_is_retried_then_counted():
+    target = NotifierTarget("electron", f"http://127.0.0.1:{free_port()}", retries=2, backoff=0.01, timeout=1)
+    target.start()
+    try:
+        target.put("STOP_GAME")
+        assert wait_until(lambda: target.failed == 1)
+    finally:
+        target.stop()
+        target.join(5)
+
+    assert target.retried == 2
+    assert target.sent == 0
+    assert target.last_error
+
+
+def test_delivery_carries_the_trace_of_the_request(listener):
+    target = NotifierTarget("electron", listener.url)
+    target.start()
+    enabled, tracing.tracer.enabled = tracing.tracer.enabled, True
+    try:
+        with tracing.span("handle_keypress", trace_id="feedface") as span:
+            target.put("STOP_GAME")
+        (_, _, headers), = listener.wait_for(1)
+    finally:
+        tracing.tracer.enabled = enabled
+        target.stop()
+        target.join(5)
+
+    assert span.trace_id == "feedface"
+    assert headers[tracing.TRACE_HEADER] == "feedface"
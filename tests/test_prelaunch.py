@@ -0,0 +1,135 @@
+import json
+
+import pytest
+
+from launcher import proctree
+from launcher.prelaunch import PrelaunchPool
+from launcher.registry import RegistryLoader
+from launcher.supervisor import ProcessSupervisor
+from launcher.terminator import TerminationEngine
+from stubs import alive, children, state, wait_until
+
+
+@pytest.fixture
+def station(stub, tmp_path):
+    """A supervisor and registry with one stub game, WRM, that runs a child like a real game's helper"""
+    games = tmp_path / "games.json"
+    games.write_text(json.dumps({"games": [
+        {"code": "WRM", "name": "Warm", "hotkey": "w", "path": stub("warm", "sleep 300 & wait")}]}))
+    registry = RegistryLoader(str(games))
+    yield ProcessSupervisor(), registry
+    registry.stop()
+
+
+def warm_up(supervisor, registry, tmp_path, warmup=0.2, **kwargs):
+    """A pool that has seen WRM played once and, now that the station is idle, warms it"""
+    pool = PrelaunchPool(supervisor, registry, size=1, warmup=warmup,
+                         state_file=str(tmp_path / "prelaunch.json"), **kwargs)
+    supervisor.spawn("WRM", [registry.current().get("WRM").path])
+    pool.record_launch("WRM")
+    TerminationEngine(supervisor).terminate()
+    return pool
+
+
+def warm_pid(pool, warm_state):
+    warm = pool.stats()["warm"]
+    return warm[0]["pid"] if warm and warm[0]["state"] == warm_state else None
+
+
+def test_idle_station_warms_and_suspends_the_popular_game(station, tmp_path):
+    supervisor, registry = station
+    pool = warm_up(supervisor, registry, tmp_path)
+    try:
+        pid = wait_until(lambda: warm_pid(pool, "suspended"))
+        assert pid
+        tree = [pid] + wait_until(lambda: children(pid))
+        # SIGSTOP is delivered asynchronously
+        assert wait_until(lambda: [state(p) for p in tree] == ["T", "T"])
+
+        process = pool.take("WRM")
+
+        assert process.pid == pid
+        assert wait_until(lambda: all(state(p) not in ("T", None) for p in tree))
+        assert pool.stats()["hits"] == 1
+        assert pool.stats()["warm"] == []
+    finally:
+        pool.close()
+
+
+def test_a_miss_suspends_whatever_is_still_warming(station, tmp_path):
+    supervisor, registry = station
+    pool = warm_up(supervisor, registry, tmp_path, warmup=60)
+    try:
+        pid = wait_until(lambda: warm_pid(pool, "warming"))
+        assert pid
+
+        assert pool.take("NAP") is None
+
+        assert pool.stats()["misses"] == 1
+        assert warm_pid(pool, "suspended") == pid
+        assert wait_until(lambda: state(pid) == "T")
+    finally:
+        pool.close()
+
+
+def test_warm_games_over_the_memory_budget_are_evicted(station, tmp_path):
+    supervisor, registry = station
+    pool = warm_up(supervisor, registry, tmp_path, memory_budget=1)
+    try:
+        assert wait_until(lambda: pool.stats()["evictions"] == 1)
+        assert pool.stats()["warm"] == []
+    finally:
+        pool.close()
+
+
+def test_warm_games_left_by_a_crash_are_killed_on_the_next_start(station, tmp_path):
+    supervisor, registry = station
+    pool = warm_up(supervisor, registry, tmp_path)
+    pid = wait_until(lambda: warm_pid(pool, "suspended"))
+    assert pid
+    tree = [pid] + children(pid)
+
+    # A new server process finds the PID and matching start time in the state file
+    PrelaunchPool(ProcessSupervisor(), registry, state_file=str(tmp_path / "prelaunch.json"))
+
+    assert wait_until(lambda: not any(alive(p) for p in tree))
+
+
+def test_a_warm_game_whose_launcher_exited_is_killed_on_take(stub, tmp_path):
+    games = tmp_path / "launcher.json"
+    games.write_text(json.dumps({"games": [
+        {"code": "LCH", "name": "Launcher", "hotkey": "l", "path": stub("launcher", "sleep 300 &\nexit 0")}]}))
+    supervisor, registry = ProcessSupervisor(), RegistryLoader(str(games))
+    pool = PrelaunchPool(supervisor, registry, size=1, warmup=60, state_file=str(tmp_path / "prelaunch.json"))
+    try:
+        supervisor.spawn("LCH", [registry.current().get("LCH").path])
+        pool.record_launch("LCH")
+        TerminationEngine(supervisor).terminate()
+        pid = wait_until(lambda: warm_pid(pool, "warming"))
+        assert pid
+        (orphan,) = wait_until(lambda: [p for p in proctree.ProcessGroup(pid).members() if p != pid])
+
+        assert pool.take("LCH") is None
+
+        assert pool.stats()["misses"] == 1
+        assert wait_until(lambda: not alive(orphan))
+    finally:
+        pool.close()
+        registry.stop()
+
+
+def test_memory_reserve_is_rechecked_while_a_game_runs(station, tmp_path):
+    supervisor, registry = station
+    pool = warm_up(supervisor, registry, tmp_path, memory_reserve=0, interval=0.1)
+    try:
+        assert wait_until(lambda: warm_pid(pool, "suspended"))
+        supervisor.spawn("NAP", ["sleep", "300"])
+        assert not wait_until(lambda: pool.stats()["evictions"], timeout=0.3)
+
+        # Memory gets short with no launch or exit to wake the pool
+        pool.memory_reserve = 2 ** 62
+
+        assert wait_until(lambda: pool.stats()["evictions"] == 1)
+    finally:
+        pool.close()
+        TerminationEngine(supervisor).terminate()
@@ -0,0 +1,49 @@
+import json
+import os
+
+import pytest
+
+from launcher.registry import Registry, RegistryError, RegistryLoader
+from stubs import ROOT, wait_until
+
+GAME = {"code": "BTS", "name": "Stub BTS", "hotkey": "b", "path": "/games/bts.exe"}
+
+
+def test_the_shipped_registry_loads():
+    with open(os.path.join(ROOT, "games.json"), encoding="utf-8") as f:
+        assert len(Registry.from_dict(json.load(f)))
+
+
+@pytest.mark.parametrize("data", [
+    [GAME],
+    {"games": {"BTS": GAME}},
+    {"games": ["BTS"]},
+    {"games": [dict(GAME, hotkey=5)]},
+    {"games": [dict(GAME, code=None)]},
+    {"games": [dict(GAME, path=["bts.exe"])]},
+    {"games": [dict(GAME, name=7)]},
+    {"games": [dict(GAME, hotkey="x")]},
+])
+def test_malformed_registries_are_rejected(data):
+    with pytest.raises(RegistryError):
+        Registry.from_dict(data)
+
+
+def test_hot_reload_survives_a_malformed_file(tmp_path):
+    path = tmp_path / "games.json"
+    path.write_text(json.dumps({"games": [GAME]}))
+    loader = RegistryLoader(str(path), interval=0.02)
+    try:
+        loader.start()
+        mtime = os.stat(path).st_mtime_ns
+        path.write_text(json.dumps({"games": [dict(GAME, hotkey=5)]}))
+        os.utime(path, ns=(mtime + 10 ** 9, mtime + 10 ** 9))
+        assert wait_until(lambda: loader.current().mtime == mtime + 10 ** 9)
+        assert loader.current().get("BTS").hotkey == "b"
+
+        path.write_text(json.dumps({"games": [dict(GAME, hotkey="t")]}))
+        os.utime(path, ns=(mtime + 2 * 10 ** 9, mtime + 2 * 10 ** 9))
+
+        assert wait_until(lambda: loader.current().get("BTS").hotkey == "t")
+    finally:
+        loader.stop()
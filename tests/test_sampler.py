@@ -0,0 +1,35 @@
+from launcher.sampler import ResourceSampler
+from launcher.supervisor import ProcessSupervisor
+from launcher.terminator import TerminationEngine
+from stubs import children, wait_until
+
+
+def test_each_process_of_a_game_is_counted_once(stub):
+    supervisor = ProcessSupervisor()
+    sampler = ResourceSampler(supervisor, interval=60)
+    game = supervisor.spawn("PAR", [stub("parent", "sleep 300 & sleep 300 & wait")])
+    try:
+        assert wait_until(lambda: len(children(game.pid)) == 2)
+
+        sampler.sample()
+
+        assert sampler.stats("PAR")["latest"]["processes"] == 3
+    finally:
+        sampler.stop()
+        TerminationEngine(supervisor).terminate()
+
+
+def test_processes_a_launcher_left_behind_are_sampled(stub):
+    supervisor = ProcessSupervisor()
+    sampler = ResourceSampler(supervisor, interval=60)
+    game = supervisor.spawn("LCH", [stub("launcher", "sleep 300 &\nsleep 300 &\nexit 0")])
+    try:
+        assert wait_until(lambda: game.process.poll() is not None)
+        assert wait_until(lambda: len(game.tree.members()) == 2)
+
+        sampler.sample()
+
+        assert sampler.stats("LCH")["latest"]["processes"] == 2
+    finally:
+        sampler.stop()
+        TerminationEngine(supervisor).terminate()
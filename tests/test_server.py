@@ -0,0 +1,38 @@
+import json
+
+from launcher.server import Station
+
+
+def test_shutdown_writes_out_the_state_journal(stub, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    station = Station("app")
+    game = station.supervisor.spawn("SLP", [stub("sleeper", "exec sleep 300")])
+
+    station.shutdown()
+
+    with open(tmp_path / "app_state.jsonl", encoding="utf-8") as f:
+        entries = [json.loads(line) for line in f]
+    assert [(entry["op"], entry["pid"], entry["game_code"]) for entry in entries] == [("start", game.pid, "SLP")]
+
+
+def test_trace_control_rejects_a_body_that_is_not_an_object(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    client = Station("app").flask_app(fastpath=False).test_client()
+
+    assert client.post('/trace', json=[True]).status_code == 400
+    assert client.post('/trace', json={"enabled": False}).json == {"enabled": False}
+
+
+def test_only_local_clients_choose_their_rate_limit_bucket(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("LAUNCHER_RATE_BATCH", "0.01/2")
+    client = Station("app").flask_app(fastpath=False).test_client()
+
+    def batch(address, n):
+        return client.post('/batch', json={"steps": [{"type": "noop"}]},
+                           headers={"X-Client-Id": f"client-{n}"},
+                           environ_base={"REMOTE_ADDR": address}).status_code
+
+    # A fresh id per request still draws on the remote address' single bucket
+    assert [batch("10.0.0.5", n) for n in range(3)] == [200, 200, 429]
+    assert [batch("127.0.0.1", n) for n in range(3)] == [200, 200, 200]
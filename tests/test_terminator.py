@@ -0,0 +1,68 @@
+import pytest
+
+from launcher.supervisor import ProcessSupervisor
+from launcher.terminator import TerminationEngine
+from stubs import alive, children, wait_until
+
+
+@pytest.fixture
+def supervisor():
+    supervisor = ProcessSupervisor()
+    supervisor.events = []
+    supervisor.subscribe(lambda event, game: supervisor.events.append((event, game.game_code)))
+    return supervisor
+
+
+def test_terminates_the_children_of_a_game(stub, supervisor):
+    game = supervisor.spawn("PAR", [stub("parent", "sleep 300 & sleep 300 & wait")])
+    assert wait_until(lambda: len(children(game.pid)) == 2)
+    pids = [game.pid] + children(game.pid)
+
+    result = TerminationEngine(supervisor).terminate()
+
+    assert result["station_free"]
+    assert sorted(process["pid"] for process in result["processes"]) == sorted(pids)
+    assert {process["outcome"] for process in result["processes"]} == {"exited"}
+    assert not any(alive(pid) for pid in pids)
+    assert supervisor.running() == []
+    assert ("terminated", "PAR") in supervisor.events
+
+
+def test_kills_what_ignores_the_polite_request(stub, supervisor):
+    # Children inherit the ignored SIGTERM
+    game = supervisor.spawn("STB", [stub("stubborn", "trap '' TERM\nsleep 300 & wait")])
+    assert wait_until(lambda: children(game.pid))
+
+    result = TerminationEngine(supervisor, grace=0.2).terminate()
+
+    assert result["station_free"]
+    assert {process["outcome"] for process in result["processes"]} == {"killed"}
+    assert len(result["processes"]) == 2
+
+
+def test_a_launcher_that_exits_leaves_the_game_running(stub, supervisor):
+    game = supervisor.spawn("LCH", [stub("launcher", "sleep 300 &\nexit 0")])
+    assert wait_until(lambda: game.process.poll() is not None)
+    (orphan,) = wait_until(lambda: [pid for pid in game.tree.members() if pid != game.pid])
+
+    # Still running, so a second launch is deduplicated and the station is busy
+    assert not game.exited.wait(0.3)
+    assert supervisor.find("LCH") is game
+    assert supervisor.events == [("launched", "LCH")]
+
+    result = TerminationEngine(supervisor).terminate()
+
+    assert result["station_free"]
+    assert orphan in [process["pid"] for process in result["processes"]]
+    assert not alive(orphan)
+    assert supervisor.running() == []
+    assert supervisor.events == [("launched", "LCH"), ("terminated", "LCH")]
+
+
+def test_a_game_exits_once_the_processes_its_launcher_left_are_gone(stub, supervisor):
+    game = supervisor.spawn("LCH", [stub("launcher", "sleep 0.5 &\nexit 3")])
+
+    assert game.exited.wait(5)
+    assert game.runtime >= 0.5
+    assert game.exit_code == 3
+    assert supervisor.events == [("launched", "LCH"), ("exited", "LCH")]